@@ -1,10 +1,16 @@
 import argparse
 import csv
 import datetime
+import hashlib
 import json
 import os
 import random
 import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -20,6 +26,13 @@ OWUI_ENDPOINT = os.environ.get("SKY_MORNING_POST", "http://127.0.0.1:3000/api/sk
 BASE_ROOT = Path(__file__).resolve().parents[2]
 OWUI_BACKEND = BASE_ROOT / "open-webui-full" / "backend"
 SKY_DAILY_DIR = OWUI_BACKEND / "data" / "sky_daily"
+# Pending OWUI posts, one <date>.json envelope each; drained by `--drain-outbox`.
+OUTBOX_DIR = Path(os.environ.get("SKY_DIGEST_OUTBOX", str(Path(__file__).resolve().parents[1] / "data" / "digest_outbox")))
+
+if str(BASE_ROOT) not in sys.path:
+    sys.path.insert(0, str(BASE_ROOT))
+from Sky import garmin_inbox, sleep_analytics  # noqa: E402
+from Sky.garmin_format import normalize_label, parse_duration, parse_file, parse_number  # noqa: E402
 
 
 # ---------------
@@ -34,21 +47,20 @@ def _clip_text(txt: str, n: int = 420) -> str:
 
 
 def _list_csvs(dirpath: Path) -> List[Path]:
-    if not dirpath.exists():
-        return []
-    files = [p for p in dirpath.glob("*.csv") if re.search(r"sleep-.*\.csv", p.name, re.I)]
-    files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-    return files
+    return [Path(e["path"]) for e in garmin_inbox.latest(n=None, directory=dirpath, sleep_only=True)]
 
 
 def _pick_csv(target_iso: Optional[str]) -> Optional[Path]:
-    files = _list_csvs(GARMIN_DIR)
     hint = target_iso or os.environ.get("SKY_GARMIN_TARGET_DATE")
     if hint:
-        for candidate in files:
+        hit = garmin_inbox.lookup(hint, directory=GARMIN_DIR)
+        if hit:
+            return Path(hit["path"])
+        for candidate in _list_csvs(GARMIN_DIR):
             if hint in candidate.stem:
                 return candidate
-    return files[0] if files else None
+    newest = garmin_inbox.latest(n=1, directory=GARMIN_DIR, sleep_only=True)
+    return Path(newest[0]["path"]) if newest else None
 
 
 def _sniff_reader(path: Path) -> Tuple[List[str], List[Dict[str, str]]]:
@@ -66,7 +78,7 @@ def _sniff_reader(path: Path) -> Tuple[List[str], List[Dict[str, str]]]:
 
 
 def _norm(s: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "", (s or "").lower())
+    return normalize_label(s)
 
 
 SYN = {
@@ -81,51 +93,38 @@ SYN = {
     "score": {"score", "sleepscore"},
     "hrv": {"hrv", "averagehrv", "hrvaverage", "avg_hrv"},
 }
+# normalized column name -> canonical metrics it can stand for (built once).
+_SYN_INDEX: Dict[str, List[str]] = {}
+for _metric, _names in SYN.items():
+    for _name in _names:
+        _SYN_INDEX.setdefault(_norm(_name), []).append(_metric)
+
+
+def _column_map(cols: List[str]) -> Dict[str, str]:
+    """Canonical metric -> first matching column of this file."""
+    mapping: Dict[str, str] = {}
+    for col in cols:
+        for metric in _SYN_INDEX.get(_norm(col), ()):
+            mapping.setdefault(metric, col)
+    return mapping
 
 
 def _to_minutes(val: Optional[str]) -> Optional[float]:
-    if val is None:
-        return None
-    s = str(val).strip()
-    if s == "" or s.lower() in ("nan", "none", "null"):
-        return None
-    try:
-        # numeric means minutes
-        return float(s.replace(",", ""))
-    except Exception:
-        pass
-    # h:mm or h:mm:ss
-    if re.match(r"^\d+:\d{2}(:\d{2})?$", s):
-        parts = [int(p) for p in s.split(":")]
-        if len(parts) == 2:
-            return parts[0] * 60 + parts[1]
-        if len(parts) == 3:
-            return parts[0] * 60 + parts[1] + parts[2] / 60.0
-    # '7h 1m', '7h', '1m'
-    m = re.match(r"(?i)^\s*(?:(\d+)\s*h(?:ours?)?)?\s*(?:(\d+)\s*m(?:in(?:utes?)?)?)?\s*$", s)
-    if m and (m.group(1) or m.group(2)):
-        h = int(m.group(1) or 0)
-        m2 = int(m.group(2) or 0)
-        return h * 60 + m2
-    # '3600 s'
-    if re.match(r"^\d+(\.\d+)?\s*s(ec|econds)?$", s, re.I):
-        sec = float(re.sub(r"[^0-9.]+", "", s))
-        return sec / 60.0
-    return None
+    return parse_duration(val)
 
 
-def _get_by_syn(row: Dict[str, str], keys: set) -> Optional[float]:
-    for k, v in row.items():
-        if _norm(k) in {_norm(x) for x in keys}:
-            return _to_minutes(v)
-    return None
+def _get_by_syn(row: Dict[str, str], colmap: Dict[str, str], metric: str) -> Optional[float]:
+    col = colmap.get(metric)
+    return _to_minutes(row.get(col)) if col else None
 
 
-def _parse_latest_metrics(target_iso: Optional[str] = None) -> Optional[Dict[str, Optional[float]]]:
-    path = _pick_csv(target_iso)
+def _parse_latest_metrics(
+    target_iso: Optional[str] = None,
+    path: Optional[Path] = None,
+) -> Optional[Dict[str, Optional[float]]]:
+    path = path or _pick_csv(target_iso)
     if not path:
         return None
-    cols, rows = _sniff_reader(path)
     out: Dict[str, Optional[float]] = {
         "file": path.name,
         "total_min": None,
@@ -142,25 +141,34 @@ def _parse_latest_metrics(target_iso: Optional[str] = None) -> Optional[Dict[str
         "light_pct": None,
     }
 
+    # Garmin's sectioned key/value export: one pass through the shared parser.
+    try:
+        record = parse_file(path)
+    except (OSError, UnicodeDecodeError, csv.Error):
+        record = None
+    if record is not None and record.has_sleep:
+        metrics = record.to_dict()
+        metrics.pop("extra", None)
+        out.update(metrics)
+        out["hrv"] = record.hrv_ms
+        return out
+
+    cols, rows = _sniff_reader(path)
+    colmap = _column_map(cols)
+
     # Case 1: single-row summary with named columns
     if rows:
         r0 = rows[0]
-        tot = _get_by_syn(r0, SYN["totalsleep"])  # minutes
-        deep = _get_by_syn(r0, SYN["deep"])
-        rem = _get_by_syn(r0, SYN["rem"])
-        light = _get_by_syn(r0, SYN["light"])
-        awake = _get_by_syn(r0, SYN["awake"]) or 0.0
+        tot = _get_by_syn(r0, colmap, "totalsleep")  # minutes
+        deep = _get_by_syn(r0, colmap, "deep")
+        rem = _get_by_syn(r0, colmap, "rem")
+        light = _get_by_syn(r0, colmap, "light")
+        awake_min = _get_by_syn(r0, colmap, "awake")
+        awake = awake_min or 0.0
         inbed = (tot or 0.0) + awake if (tot or 0.0) + awake > 0 else None
         eff = (100.0 * tot / inbed) if (inbed and tot) else None
-        score = None
-        for k in ("score", "sleepscore"):
-            if any(_norm(c) == k for c in cols):
-                try:
-                    score = float(re.sub(r"[^0-9.]+", "", str(r0.get(next(c for c in cols if _norm(c) == k), ""))))
-                except Exception:
-                    score = None
-                break
-        hrv = _get_by_syn(r0, SYN["hrv"])  # assume ms already
+        score = parse_number(r0.get(colmap["score"])) if "score" in colmap else None
+        hrv = _get_by_syn(r0, colmap, "hrv")  # assume ms already
 
         if tot or deep or rem or light:
             out.update(
@@ -169,7 +177,7 @@ def _parse_latest_metrics(target_iso: Optional[str] = None) -> Optional[Dict[str
                     "deep_min": deep,
                     "rem_min": rem,
                     "light_min": light,
-                    "awake_min": _get_by_syn(r0, SYN["awake"]),
+                    "awake_min": awake_min,
                     "inbed_min": inbed,
                     "eff": eff,
                     "score": score,
@@ -184,8 +192,8 @@ def _parse_latest_metrics(target_iso: Optional[str] = None) -> Optional[Dict[str
             return out
 
     # Case 2: stage timeline with Stage + Duration columns
-    stage_key = next((k for k in cols if _norm(k) in {_norm(x) for x in SYN["stage"]}), None)
-    dur_key = next((k for k in cols if _norm(k) in {_norm(x) for x in SYN["duration"]}), None)
+    stage_key = colmap.get("stage")
+    dur_key = colmap.get("duration")
     if stage_key and dur_key:
         sums: Dict[str, float] = {"deep": 0.0, "rem": 0.0, "light": 0.0, "awake": 0.0}
         for r in rows:
@@ -219,72 +227,20 @@ def _parse_latest_metrics(target_iso: Optional[str] = None) -> Optional[Dict[str
             out["light_pct"] = 100.0 * sums["light"] / total
         return out
 
-    # Case 3: key/value two-column CSV
+    return out
+
+
+def _sleep_trends(digest_date: str, m: Optional[Dict[str, Optional[float]]]) -> Optional[Dict[str, Dict]]:
+    """Rolling baselines for the night from the cached history, or None if unavailable."""
+    if not m:
+        return None
     try:
-        with path.open("r", encoding="utf-8", newline="") as f:
-            head = f.read(2048)
-            f.seek(0)
-            try:
-                dialect = csv.Sniffer().sniff(head, delimiters=",;\t")
-            except Exception:
-                dialect = csv.excel
-            rdr = csv.reader(f, dialect=dialect)
-            pairs: List[Tuple[str, str]] = []
-            for row in rdr:
-                if not row:
-                    continue
-                key = (row[0] or "").strip()
-                val = (row[1] or "").strip() if len(row) > 1 else ""
-                if key and val and not key.lower().startswith("sleep score 1 day") and not key.lower().endswith("factors") and not key.lower().startswith("sleep timeline"):
-                    pairs.append((key, val))
-        if pairs:
-            kv = {k: v for k, v in pairs}
-            tot = _to_minutes(kv.get("Sleep Duration"))
-            deep = _to_minutes(kv.get("Deep Sleep Duration"))
-            rem = _to_minutes(kv.get("REM Duration"))
-            light = _to_minutes(kv.get("Light Sleep Duration"))
-            awake = _to_minutes(kv.get("Awake Time")) or 0.0
-            inbed = (tot or 0.0) + awake if (tot or 0.0) + awake > 0 else None
-            eff = (100.0 * tot / inbed) if (inbed and tot) else None
-            score = None
-            if "Sleep Score" in kv:
-                try:
-                    score = float(re.sub(r"[^0-9.]+", "", kv["Sleep Score"]))
-                except Exception:
-                    score = None
-            hrv = None
-            for k in ("Avg Overnight HRV", "Average HRV", "HRV"):
-                if k in kv:
-                    try:
-                        hrv = float(re.sub(r"[^0-9.]+", "", kv[k]))
-                    except Exception:
-                        hrv = None
-                    break
-            out.update(
-                {
-                    "total_min": tot,
-                    "deep_min": deep,
-                    "rem_min": rem,
-                    "light_min": light,
-                    "awake_min": _to_minutes(kv.get("Awake Time")),
-                    "inbed_min": inbed,
-                    "eff": eff,
-                    "score": score,
-                    "hrv": hrv,
-                }
-            )
-            total = (tot or 0.0)
-            if total > 0:
-                out["deep_pct"] = (100.0 * (deep or 0.0) / total) if deep is not None else None
-                out["rem_pct"] = (100.0 * (rem or 0.0) / total) if rem is not None else None
-                out["light_pct"] = (100.0 * (light or 0.0) / total) if light is not None else None
-            return out
+        return sleep_analytics.summary(digest_date, tonight=m)
     except Exception:
-        pass
-    return out
+        return None
 
 
-def _sleep_prose(m: Optional[Dict[str, Optional[float]]]) -> str:
+def _sleep_prose(m: Optional[Dict[str, Optional[float]]], trends: Optional[Dict[str, Dict]] = None) -> str:
     if not m:
         return "No sleep data found."
     tot = m.get("total_min") or 0
@@ -316,16 +272,31 @@ def _sleep_prose(m: Optional[Dict[str, Optional[float]]]) -> str:
         p1_bits.append(f"Garmin's sleep score was {score:.0f}, a simple read on overall quality.")
     if hrv is not None:
         p1_bits.append(f"Average overnight HRV was about {hrv:.0f} ms, a soft indicator of recovery.")
+    if trends:
+        p1_bits.extend(sleep_analytics.describe(trends))
     p1 = " ".join(p1_bits)
 
+    def off_baseline(metric: str, value: Optional[float], fixed: float) -> bool:
+        """Worse than usual (1+ SD and 5%+ off the baseline median), else past the fixed threshold."""
+        higher_is_better = sleep_analytics.METRICS[metric][2]
+        entry = (trends or {}).get(metric) or {}
+        if entry.get("z") is not None and entry.get("vs_median_pct") is not None:
+            sign = -1.0 if higher_is_better else 1.0
+            return sign * entry["z"] >= 1.0 and sign * entry["vs_median_pct"] >= 5.0
+        if value is None:
+            return False
+        return value < fixed if higher_is_better else value > fixed
+
     # Tailored feedback and actions
     recs: List[str] = []
-    if deep_pct is not None and deep_pct < 20:
+    if off_baseline("deep_pct", deep_pct, 20):
         recs.append("Deep sleep ran a bit light — try a cooler room, darker lighting, and a gentle 20–30 minute wind-down.")
-    if rem_pct is not None and rem_pct < 20:
+    if off_baseline("rem_pct", rem_pct, 20):
         recs.append("REM looked light — reduce late-night screens and heavy food; light stretching and quiet reading can help.")
-    if eff is not None and eff < 85:
+    if off_baseline("eff", eff, 85):
         recs.append("Efficiency dipped — aim for a consistent bedtime and limit in-bed wake time; if you're awake, get up for 5–10 minutes and reset.")
+    if trends and (off_baseline("hrv", hrv, 0.0) or off_baseline("rhr", m.get("resting_hr"), float("inf"))):
+        recs.append("Recovery markers are off your usual range — keep today's training easy and prioritise an early night.")
     if not recs:
         recs.append("Overall pattern looks steady — keep the same pre-sleep routine and timing to compound results.")
     recs.append("Tonight: finish caffeine by early afternoon, dim lights 60–90 minutes before bed, and park tomorrow's to‑dos on paper.")
@@ -338,81 +309,336 @@ def _sleep_prose(m: Optional[Dict[str, Optional[float]]]) -> str:
 # News fetchers (RSS/Atom)
 # ---------------------------
 
-FEEDS = [
+DEFAULT_FEEDS = [
     "http://feeds.bbci.co.uk/news/world/rss.xml",
     "https://feeds.reuters.com/reuters/worldNews",
     "https://feeds.npr.org/1001/rss.xml",
 ]
+FEEDS = [u.strip() for u in os.environ.get("SKY_NEWS_FEEDS", "").split(",") if u.strip()] or DEFAULT_FEEDS
+# Parsed items + ETag/Last-Modified per feed. Within the TTL a rerun skips the
+# network entirely; after it, a conditional GET revalidates.
+FEED_CACHE_DIR = Path(os.environ.get("SKY_FEED_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "data" / "feed_cache")))
+FEED_CACHE_TTL = float(os.environ.get("SKY_FEED_CACHE_TTL", "900"))
+FEED_MAX_ITEMS = int(os.environ.get("SKY_FEED_MAX_ITEMS", "60"))
+FEED_STALE_RUN = 3
+FEED_TIMEOUT = float(os.environ.get("SKY_NEWS_FEED_TIMEOUT", "8"))
+# Wall-clock budget for the whole news stage; feeds still pending are dropped.
+NEWS_DEADLINE = float(os.environ.get("SKY_NEWS_DEADLINE", "10"))
+# Backfilled digests read the news as of this local time on their own date.
+BACKFILL_AS_OF = datetime.time(7, 0)
+BACKFILL_WORKERS = int(os.environ.get("SKY_BACKFILL_WORKERS", "8"))
 
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
 
-def _parse_feed(url: str) -> List[Dict]:
-    items: List[Dict] = []
+
+def _session() -> requests.Session:
+    """Shared keep-alive session so feeds on the same host reuse connections."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=len(FEEDS), pool_maxsize=len(FEEDS))
+            _SESSION.mount("http://", adapter)
+            _SESSION.mount("https://", adapter)
+        return _SESSION
+
+
+def _feed_cache_path(url: str) -> Path:
+    return FEED_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.json"
+
+
+def _load_feed_cache(url: str) -> Optional[Dict]:
+    path = _feed_cache_path(url)
     try:
-        r = requests.get(url, timeout=8)
-        r.raise_for_status()
-        root = ET.fromstring(r.content)
-        # RSS: channel/item
-        for it in root.findall('.//item'):
-            title = (it.findtext('title') or '').strip()
-            link = (it.findtext('link') or '').strip()
-            desc = (it.findtext('description') or '').strip()
-            pd = it.findtext('pubDate') or ''
-            dt = None
-            try:
-                dt = parsedate_to_datetime(pd)
-            except Exception:
-                dt = None
-            if title:
-                items.append({"title": title, "link": link, "summary": desc, "published": dt})
-        # Atom: entry
-        for it in root.findall('.//{http://www.w3.org/2005/Atom}entry'):
-            title = (it.findtext('{http://www.w3.org/2005/Atom}title') or '').strip()
-            link_el = it.find('{http://www.w3.org/2005/Atom}link')
-            link = link_el.get('href') if link_el is not None else ''
-            desc = (it.findtext('{http://www.w3.org/2005/Atom}summary') or '').strip()
-            pd = it.findtext('{http://www.w3.org/2005/Atom}updated') or ''
-            dt = None
-            try:
-                dt = parsedate_to_datetime(pd)
-            except Exception:
-                try:
-                    dt = datetime.datetime.fromisoformat(pd.replace('Z', '+00:00'))
-                except Exception:
-                    dt = None
-            if title:
-                items.append({"title": title, "link": link, "summary": desc, "published": dt})
+        entry = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if entry.get("url") != url:
+        return None
+    for item in entry.get("items", []):
+        pub = item.get("published")
+        item["published"] = datetime.datetime.fromisoformat(pub) if pub else None
+    return entry
+
+
+def _cache_covers(cached: Optional[Dict], since: Optional[datetime.datetime]) -> bool:
+    """True when the cached items were parsed back at least as far as ``since``."""
+    if not cached:
+        return False
+    cached_since = cached.get("since")
+    if not cached_since:
+        return True
+    return since is not None and datetime.datetime.fromisoformat(cached_since) <= since
+
+
+def _save_feed_cache(
+    url: str,
+    items: List[Dict],
+    validators: Dict[str, str],
+    since: Optional[datetime.datetime] = None,
+) -> None:
+    FEED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "url": url,
+        "fetched_at": time.time(),
+        "etag": validators.get("etag"),
+        "last_modified": validators.get("last_modified"),
+        "since": since.isoformat() if since else None,
+        "items": [
+            {**item, "published": item["published"].isoformat() if item.get("published") else None}
+            for item in items
+        ],
+    }
+    path = _feed_cache_path(url)
+    tmp = path.with_name(path.name + f".{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(entry), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _local_naive(dt: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    if dt is not None and dt.tzinfo is not None:
+        try:
+            return dt.astimezone().replace(tzinfo=None)
+        except Exception:
+            return dt.replace(tzinfo=None)
+    return dt
+
+
+def _parse_date(text: str) -> Optional[datetime.datetime]:
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        return parsedate_to_datetime(text)
     except Exception:
-        return []
+        pass
+    try:
+        return datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _feed_item(el: ET.Element) -> Optional[Dict]:
+    """One RSS <item> or Atom <entry> as a digest item; namespaces are ignored."""
+    fields: Dict[str, str] = {}
+    link = ""
+    for child in el:
+        name = _local(child.tag)
+        if name == "link":
+            href = child.get("href")
+            if href and (not link or child.get("rel", "alternate") == "alternate"):
+                link = href
+            elif not href and not link:
+                link = (child.text or "").strip()
+        elif name not in fields:
+            fields[name] = (child.text or "").strip()
+    title = fields.get("title", "")
+    if not title:
+        return None
+    published = fields.get("pubDate") or fields.get("published") or fields.get("updated") or fields.get("date") or ""
+    return {
+        "title": title,
+        "link": link,
+        "summary": fields.get("description") or fields.get("summary") or "",
+        "published": _parse_date(published),
+    }
+
+
+class _DeadlineReader:
+    """File-like wrapper that refuses further reads once ``deadline`` (monotonic) passes.
+
+    ``requests`` timeouts bound each socket read, not the download, so a feed
+    trickling small chunks would otherwise run past the news deadline.
+    """
+
+    def __init__(self, stream, deadline: float) -> None:
+        self._stream = stream
+        self._deadline = deadline
+
+    def read(self, size: int = -1) -> bytes:
+        if time.monotonic() >= self._deadline:
+            raise TimeoutError("news deadline reached mid-download")
+        return self._stream.read(size)
+
+
+def _iter_feed_items(
+    stream,
+    since: Optional[datetime.datetime] = None,
+    limit: int = 0,
+    deadline: Optional[float] = None,
+) -> List[Dict]:
+    """Single streaming pass over RSS or Atom.
+
+    Each finished <item>/<entry> is converted and detached from its parent,
+    so memory stays flat regardless of feed size. Feeds list newest first, so
+    parsing stops after ``FEED_STALE_RUN`` consecutive items older than
+    ``since`` or once ``limit`` items have been collected. With ``deadline``
+    (``time.monotonic()``) the download is abandoned between chunks once it
+    passes, raising TimeoutError.
+    """
+    if deadline is not None:
+        stream = _DeadlineReader(stream, deadline)
+    items: List[Dict] = []
+    stack: List[ET.Element] = []
+    stale = 0
+    for event, el in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(el)
+            continue
+        stack.pop()
+        if _local(el.tag) not in ("item", "entry"):
+            continue
+        item = _feed_item(el)
+        if stack:
+            stack[-1].remove(el)
+        el.clear()
+        if item is None:
+            continue
+        published = _local_naive(item["published"])
+        if since is not None and published is not None and published < since:
+            stale += 1
+            if stale >= FEED_STALE_RUN:
+                break
+            continue
+        stale = 0
+        items.append(item)
+        if limit and len(items) >= limit:
+            break
     return items
 
 
-def fetch_news() -> Tuple[List[str], List[str]]:
-    now = datetime.datetime.now()
+def _parse_feed(
+    url: str,
+    timeout: float = FEED_TIMEOUT,
+    cached: Optional[Dict] = None,
+    since: Optional[datetime.datetime] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[Optional[List[Dict]], Dict[str, str]]:
+    """Download and stream-parse one RSS/Atom feed; network, XML and deadline errors propagate.
+
+    Sends If-None-Match/If-Modified-Since from ``cached``; returns
+    ``(None, validators)`` on 304 Not Modified, else ``(items, validators)``
+    with items published before ``since`` dropped.
+    """
+    headers: Dict[str, str] = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    with _session().get(url, timeout=timeout, headers=headers, stream=True) as r:
+        validators = {
+            "etag": r.headers.get("ETag") or (cached or {}).get("etag"),
+            "last_modified": r.headers.get("Last-Modified") or (cached or {}).get("last_modified"),
+        }
+        if r.status_code == 304:
+            return None, validators
+        r.raise_for_status()
+        r.raw.decode_content = True  # let urllib3 undo gzip/deflate as we read
+        return _iter_feed_items(r.raw, since=since, limit=FEED_MAX_ITEMS, deadline=deadline), validators
+
+
+def _fetch_feed(url: str, deadline: float, since: Optional[datetime.datetime] = None) -> Tuple[List[Dict], Dict[str, object]]:
+    """Cached items within the TTL, else a conditional GET; stale cache on failure."""
+    start = time.monotonic()
+    stat: Dict[str, object] = {"url": url, "ok": False, "items": 0}
+    cached = _load_feed_cache(url)
+    # Items were cut off at the cached ``since``; a request reaching further back
+    # (backfill) must refetch in full rather than revalidate the truncated list.
+    covers = _cache_covers(cached, since)
+    if covers and time.time() - cached.get("fetched_at", 0) < FEED_CACHE_TTL:
+        items = cached["items"]
+        stat.update(ok=True, items=len(items), source="cache", ms=round((time.monotonic() - start) * 1000.0, 1))
+        return items, stat
+    try:
+        timeout = max(0.5, min(FEED_TIMEOUT, deadline - start))
+        items, validators = _parse_feed(
+            url, timeout=timeout, cached=cached if covers else None, since=since, deadline=deadline
+        )
+        if items is None:
+            items = cached["items"]
+            since = datetime.datetime.fromisoformat(cached["since"]) if cached.get("since") else None
+            stat["source"] = "not-modified"
+        else:
+            stat["source"] = "network"
+        _save_feed_cache(url, items, validators, since)
+        stat.update(ok=True, items=len(items))
+    except Exception as exc:
+        items = cached["items"] if cached else []
+        stat.update(items=len(items), error=f"{type(exc).__name__}: {exc}")
+        if cached:
+            stat["source"] = "stale-cache"
+    stat["ms"] = round((time.monotonic() - start) * 1000.0, 1)
+    return items, stat
+
+
+def _in_daemon(name: str, fn, *args) -> Future:
+    """Run ``fn`` on a daemon thread, so a stuck download never holds up interpreter exit."""
+    future: Future = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
+
+
+def _gather_feeds(feeds: List[str], since: Optional[datetime.datetime] = None) -> Tuple[List[Dict], Dict[str, object]]:
+    """Fetch every feed concurrently; whatever has not answered by the deadline is skipped.
+
+    Feeds run on daemon threads and stop reading at the deadline, so a slow
+    feed bounds neither the digest nor the lifetime of the reporter process.
+    """
+    start = time.monotonic()
+    deadline = start + NEWS_DEADLINE
+    pool: List[Dict] = []
+    stats: List[Dict[str, object]] = []
+    futures = {_in_daemon(f"sky-feed-{i}", _fetch_feed, url, deadline, since): url for i, url in enumerate(feeds)}
+    done, pending = wait(futures, timeout=NEWS_DEADLINE)
+    for future in futures:
+        if future in done:
+            items, stat = future.result()
+            pool.extend(items)
+        else:
+            stat = {"url": futures[future], "ok": False, "items": 0, "error": "deadline", "ms": None}
+        stats.append(stat)
+    meta = {
+        "elapsed_ms": round((time.monotonic() - start) * 1000.0, 1),
+        "deadline_s": NEWS_DEADLINE,
+        "partial": bool(pending) or not all(st["ok"] for st in stats),
+        "feeds": stats,
+    }
+    return pool, meta
+
+
+def _news_windows(pool: List[Dict], now: datetime.datetime) -> Tuple[List[str], List[str]]:
+    """Overnight (12h before ``now``) and previous-calendar-day headlines from ``pool``."""
     start_12h = now - datetime.timedelta(hours=12)
     # yesterday window (local)
-    today_mid = datetime.datetime.combine(datetime.date.today(), datetime.time(0, 0, 0))
+    today_mid = datetime.datetime.combine(now.date(), datetime.time(0, 0, 0))
     y_start = today_mid - datetime.timedelta(days=1)
     y_end = today_mid
 
-    pool: List[Dict] = []
-    for u in FEEDS:
-        pool.extend(_parse_feed(u))
+    def key(item):
+        return _local_naive(item.get('published')) or datetime.datetime.min
+    ordered = sorted(pool, key=key, reverse=True)
 
     def pick(start: datetime.datetime, end: datetime.datetime, limit: int) -> List[str]:
         out: List[str] = []
         seen = set()
-        def key(item):
-            dt = item.get('published') or datetime.datetime.min
-            return dt
-        for it in sorted(pool, key=key, reverse=True):
-            dt = it.get('published')
+        for it in ordered:
+            dt = _local_naive(it.get('published'))
             if not isinstance(dt, datetime.datetime):
                 continue
-            if dt.tzinfo is not None:
-                try:
-                    dt = dt.astimezone().replace(tzinfo=None)
-                except Exception:
-                    dt = dt.replace(tzinfo=None)
             if start <= dt <= end:
                 t = it.get('title') or ''
                 if not t:
@@ -443,7 +669,16 @@ def fetch_news() -> Tuple[List[str], List[str]]:
     return last12, yester
 
 
-def suggested_plans() -> List[str]:
+def fetch_news(now: Optional[datetime.datetime] = None) -> Tuple[List[str], List[str], Dict[str, object]]:
+    """Overnight and previous-day headlines as of ``now``, plus per-feed timing metadata."""
+    now = now or datetime.datetime.now()
+    y_start = datetime.datetime.combine(now.date() - datetime.timedelta(days=1), datetime.time(0, 0, 0))
+    pool, meta = _gather_feeds(FEEDS, since=y_start)
+    last12, yester = _news_windows(pool, now)
+    return last12, yester, meta
+
+
+def suggested_plans(day: Optional[datetime.date] = None) -> List[str]:
     weekday_core = [
         "Wake, water, and 5–10 minutes of daylight",
         "Morning movement (mobility + 5 minutes breathing)",
@@ -465,7 +700,7 @@ def suggested_plans() -> List[str]:
         "Meal prep or shopping (60 min)",
         "Plan the week in 20 minutes: priorities and 3 key blocks",
     ]
-    dow = datetime.datetime.today().weekday()
+    dow = (day or datetime.date.today()).weekday()
     return weekend_core if dow in (5, 6) else weekday_core
 
 
@@ -499,9 +734,9 @@ def food_plan() -> List[str]:
     return random.choice(options)
 
 
-def _load_last_advice() -> Optional[str]:
+def _load_last_advice(day: Optional[datetime.date] = None) -> Optional[str]:
     try:
-        y = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+        y = ((day or datetime.date.today()) - datetime.timedelta(days=1)).isoformat()
         p = SKY_DAILY_DIR / f"{y}.json"
         if p.exists():
             return json.loads(p.read_text(encoding="utf-8")).get("good_word_of_advice")
@@ -510,7 +745,7 @@ def _load_last_advice() -> Optional[str]:
     return None
 
 
-def _select_advice() -> str:
+def _select_advice(day: Optional[datetime.date] = None, last: Optional[str] = None) -> str:
     pool = [
         "Progress favors consistency over intensity.",
         "Protect the first hour; it sets the pace.",
@@ -522,25 +757,37 @@ def _select_advice() -> str:
         "Keep your energy for what compounds and cut the rest.",
         "Today is built from what you measure and what you ignore.",
     ]
-    last = _load_last_advice()
+    if last is None:
+        last = _load_last_advice(day)
     candidates = [a for a in pool if a != last] or pool
     return random.choice(candidates)
 
 
-def morning_digest(target_iso: Optional[str] = None) -> Dict:
-    metrics = _parse_latest_metrics(target_iso)
-    news12, news_yday = fetch_news()
-    digest_date = target_iso or datetime.date.today().isoformat()
-    payload = {
+def _digest_payload(
+    digest_date: str,
+    metrics: Optional[Dict[str, Optional[float]]],
+    news: Tuple[List[str], List[str], Dict[str, object]],
+    plans: List[str],
+    advice: str,
+) -> Dict:
+    news12, news_yday, news_meta = news
+    trends = _sleep_trends(digest_date, metrics)
+    return {
         "date": digest_date,
-        "sleep_review": _sleep_prose(metrics),
+        "sleep_review": _sleep_prose(metrics, trends),
         "overnight_news": news12,
         "previous_day_news": news_yday,
-        "plans_placeholder": suggested_plans(),
+        "plans_placeholder": plans,
         "food_recommendations": food_plan(),
-        "good_word_of_advice": _select_advice(),
+        "good_word_of_advice": advice,
+        "meta": {"news": news_meta, "sleep_trends": trends},
     }
-    return payload
+
+
+def morning_digest(target_iso: Optional[str] = None) -> Dict:
+    metrics = _parse_latest_metrics(target_iso)
+    digest_date = target_iso or datetime.date.today().isoformat()
+    return _digest_payload(digest_date, metrics, fetch_news(), suggested_plans(), _select_advice())
 
 
 def _save_local(payload: Dict) -> str:
@@ -551,29 +798,265 @@ def _save_local(payload: Dict) -> str:
     return str(path)
 
 
-def post_digest(payload: Dict) -> None:
-    stored = _save_local(payload)
+# Outbox sender: retries back off exponentially (with jitter) up to the cap;
+# the lock keeps a single sender alive, refreshed on every pass.
+OUTBOX_BACKOFF_BASE = 5.0
+OUTBOX_BACKOFF_MAX = float(os.environ.get("SKY_OUTBOX_BACKOFF_MAX", "600"))
+OUTBOX_BATCH = int(os.environ.get("SKY_OUTBOX_BATCH", "20"))
+OUTBOX_POLL = 5.0
+OUTBOX_LOCK_STALE = 600.0
+OUTBOX_POST_TIMEOUT = 10.0
+# A sender gives up after this long; the next reporter run starts a new one.
+OUTBOX_SENDER_LIFETIME = float(os.environ.get("SKY_OUTBOX_SENDER_LIFETIME", str(6 * 3600)))
+
+
+def _outbox_lock() -> Path:
+    return OUTBOX_DIR / ".sender.lock"
+
+
+def _write_envelope(path: Path, envelope: Dict) -> None:
+    tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(envelope), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _enqueue(payload: Dict) -> Path:
+    """Queue ``payload`` for OWUI; a newer digest for the same date replaces the pending one."""
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    path = OUTBOX_DIR / f"{payload.get('date')}.json"
+    _write_envelope(path, {"queued_at": time.time(), "attempts": 0, "next_attempt": 0.0, "payload": payload})
+    return path
+
+
+def _pending() -> List[Path]:
+    if not OUTBOX_DIR.exists():
+        return []
+    return sorted(OUTBOX_DIR.glob("*.json"))
+
+
+def _acquire_sender_lock() -> bool:
+    lock = _outbox_lock()
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        if time.time() - lock.stat().st_mtime > OUTBOX_LOCK_STALE:
+            lock.unlink(missing_ok=True)  # previous sender died without cleaning up
+    except OSError:
+        pass
     try:
-        res = requests.post(OWUI_ENDPOINT, json=payload, timeout=10)
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as handle:
+        handle.write(f"{os.getpid()} {time.time()}")
+    return True
+
+
+def _queued_at(path: Path) -> Optional[float]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("queued_at")
+    except (OSError, ValueError):
+        return None
+
+
+def _send_due(now: float) -> Tuple[int, Optional[float]]:
+    """One pass: post up to ``OUTBOX_BATCH`` due envelopes over the shared keep-alive session.
+
+    Returns ``(sent, next_due)``; ``next_due`` is the earliest time something
+    is still pending, or None once the outbox is empty.
+    """
+    sent = 0
+    next_due: Optional[float] = None
+    batch = 0
+    for path in _pending():
         try:
-            remote_payload = res.json()
-        except ValueError:
-            remote_payload = {"raw": res.text}
-        result = {
-            "status": "ok",
-            "stored": stored,
-            "remote": remote_payload,
-        }
-        print(f"[{res.status_code}] Morning digest posted -> {result}")
-    except Exception as e:
-        print(f"FAILED to post morning digest: {e}. Local file saved at: {stored}")
+            envelope = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue  # mid-replace or just sent; the next pass sees it
+        due = float(envelope.get("next_attempt", 0.0))
+        if due > now or batch >= OUTBOX_BATCH:
+            next_due = due if next_due is None else min(next_due, due)
+            continue
+        batch += 1
+        try:
+            res = _session().post(OWUI_ENDPOINT, json=envelope["payload"], timeout=OUTBOX_POST_TIMEOUT)
+            res.raise_for_status()
+        except Exception as exc:
+            attempts = int(envelope.get("attempts", 0)) + 1
+            delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            print(f"[outbox] {path.name}: attempt {attempts} failed ({exc}); retry in {delay:.0f}s", flush=True)
+            due = now
+            if _queued_at(path) == envelope["queued_at"]:
+                envelope.update(attempts=attempts, next_attempt=time.time() + delay, last_error=str(exc))
+                _write_envelope(path, envelope)
+                due = envelope["next_attempt"]
+            next_due = due if next_due is None else min(next_due, due)
+            continue
+        sent += 1
+        print(f"[outbox] {path.name}: posted [{res.status_code}]", flush=True)
+        queued_at = _queued_at(path)
+        if queued_at == envelope["queued_at"]:
+            path.unlink(missing_ok=True)
+        elif queued_at is not None:
+            next_due = now  # re-queued while this post was in flight
+    return sent, next_due
+
+
+def drain_outbox() -> int:
+    """Post queued digests until the outbox is empty; returns the number posted.
+
+    Only one sender runs at a time (lock file in the outbox). Failed posts are
+    retried with exponential backoff; the sender exits once nothing is
+    pending or after ``OUTBOX_SENDER_LIFETIME``.
+    """
+    total = 0
+    deadline = time.time() + OUTBOX_SENDER_LIFETIME
+    # Re-checked after the lock is released, so a digest queued while this
+    # sender was shutting down does not wait for the next reporter run.
+    while time.time() < deadline and _pending() and _acquire_sender_lock():
+        lock = _outbox_lock()
+        try:
+            while time.time() < deadline:
+                sent, next_due = _send_due(time.time())
+                total += sent
+                if next_due is None:
+                    break
+                os.utime(lock)
+                now = time.time()
+                time.sleep(max(0.0, min(OUTBOX_POLL, next_due - now, deadline - now)))
+        finally:
+            lock.unlink(missing_ok=True)
+    return total
+
+
+def _spawn_sender() -> None:
+    """Start a detached ``--drain-outbox`` process that outlives the reporter."""
+    OUTBOX_DIR.mkdir(parents=True, exist_ok=True)
+    kwargs: Dict[str, object] = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+    else:
+        kwargs["start_new_session"] = True
+    with (OUTBOX_DIR / "sender.log").open("ab") as log:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--drain-outbox"],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            close_fds=True,
+            **kwargs,
+        )
+
+
+def _queue_digest(payload: Dict) -> str:
+    stored = _save_local(payload)
+    _enqueue(payload)
+    return stored
+
+
+def post_digest(payload: Dict) -> None:
+    """Write the digest locally and hand the OWUI post to the background sender."""
+    stored = _queue_digest(payload)
+    try:
+        _spawn_sender()
+        print(f"Morning digest saved -> {stored}; queued for {OWUI_ENDPOINT}")
+    except OSError as e:
+        print(f"Morning digest saved -> {stored}; sender not started ({e}), run --drain-outbox to post")
+
+
+def backfill(start: datetime.date, end: datetime.date) -> List[Dict]:
+    """Build and write one digest per date in ``start..end`` inclusive.
+
+    Each night's CSV is resolved through the inbox index and parsed once;
+    dates without their own CSV get "No sleep data found." rather than the
+    newest export. Feeds are fetched once, reaching back to the day before
+    ``start``, and every date picks its windows from that shared pool.
+    Payloads are built in date order (advice avoids repeating the previous
+    day), written concurrently and queued for one background sender.
+    """
+    days = [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+    t0 = time.perf_counter()
+
+    parsed: Dict[str, Optional[Dict[str, Optional[float]]]] = {}
+    nights: Dict[datetime.date, Optional[Dict[str, Optional[float]]]] = {}
+    for day in days:
+        hit = garmin_inbox.lookup(day.isoformat(), directory=GARMIN_DIR)
+        if not hit:
+            nights[day] = None
+            continue
+        if hit["path"] not in parsed:
+            parsed[hit["path"]] = _parse_latest_metrics(day.isoformat(), path=Path(hit["path"]))
+        nights[day] = parsed[hit["path"]]
+    t_parse = time.perf_counter()
+
+    since = datetime.datetime.combine(start - datetime.timedelta(days=1), datetime.time(0, 0, 0))
+    pool, news_meta = _gather_feeds(FEEDS, since=since)
+    t_news = time.perf_counter()
+
+    today = datetime.date.today()
+    payloads: List[Dict] = []
+    last_advice = _load_last_advice(start)
+    for day in days:
+        now = datetime.datetime.now() if day >= today else datetime.datetime.combine(day, BACKFILL_AS_OF)
+        last12, yester = _news_windows(pool, now)
+        advice = _select_advice(day, last=last_advice or "")
+        last_advice = advice
+        payloads.append(
+            _digest_payload(day.isoformat(), nights[day], (last12, yester, news_meta), suggested_plans(day), advice)
+        )
+    t_build = time.perf_counter()
+
+    timings: Dict[str, float] = {}
+
+    def write(payload: Dict) -> None:
+        t = time.perf_counter()
+        _queue_digest(payload)
+        timings[payload["date"]] = time.perf_counter() - t
+
+    with ThreadPoolExecutor(max_workers=max(1, min(BACKFILL_WORKERS, len(payloads)))) as executor:
+        list(executor.map(write, payloads))
+    t_end = time.perf_counter()
+    try:
+        _spawn_sender()
+    except OSError as exc:
+        print(f"[backfill] sender not started ({exc}); run --drain-outbox to post")
+
+    for day in days:
+        night = nights[day]
+        print(f"[backfill] {day.isoformat()}  csv={night['file'] if night else '-':<40}  write={timings[day.isoformat()] * 1000.0:7.1f} ms")
+    total = t_end - t0
+    print(
+        f"[backfill] {len(days)} days, {len(parsed)} CSVs parsed, {len(pool)} news items: "
+        f"parse {t_parse - t0:.2f}s, news {t_news - t_parse:.2f}s, build {t_build - t_news:.2f}s, "
+        f"write {t_end - t_build:.2f}s; total {total:.2f}s "
+        f"({len(days) / total if total else 0.0:.1f} days/s, {1000.0 * total / len(days):.1f} ms/day)"
+    )
+    return payloads
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--date", help="ISO date YYYY-MM-DD; defaults to SKY_GARMIN_TARGET_DATE or newest CSV")
+    parser.add_argument("--from", dest="from_date", help="Backfill: first ISO date (inclusive)")
+    parser.add_argument("--to", dest="to_date", help="Backfill: last ISO date (inclusive); defaults to today")
+    parser.add_argument("--drain-outbox", action="store_true", help="Post queued digests to OWUI, then exit")
     cli_args = parser.parse_args()
 
+    if cli_args.drain_outbox:
+        print(f"[outbox] sender {os.getpid()} drained {drain_outbox()} digest(s)", flush=True)
+        sys.exit(0)
+    if cli_args.from_date:
+        try:
+            first = datetime.date.fromisoformat(cli_args.from_date.strip())
+            last = datetime.date.fromisoformat(cli_args.to_date.strip()) if cli_args.to_date else datetime.date.today()
+        except ValueError as exc:
+            parser.error(str(exc))
+        if last < first:
+            parser.error("--to must not be before --from")
+        backfill(first, last)
+        sys.exit(0)
+    if cli_args.to_date:
+        parser.error("--to requires --from")
+
     target_date = None
     if getattr(cli_args, "date", None):
         target_date = cli_args.date.strip()
@@ -3,7 +3,6 @@ import os
 import shutil
 import subprocess
 import sys
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -15,6 +14,10 @@ DOWNLOAD_INBOX = SKY / "downloads" / "garmin"
 USER_DOWNLOADS = Path(os.environ.get("USERPROFILE", "")) / "Downloads"
 REPORTER = SKY / "agents" / "morning_reporter.py"
 
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+from Sky.garmin_watcher import wait_for_file  # noqa: E402
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Sky Morning Orchestrator")
@@ -71,15 +74,12 @@ def run_click_replay(target_iso: str, when_hint: str | None) -> None:
 
 def wait_for_csv(target_iso: str, timeout: int) -> Path:
     pattern = f"sleep-{target_iso}"
-    deadline = time.time() + timeout
     print(f"[wait] Watching {USER_DOWNLOADS} for {pattern}*.csv (timeout {timeout}s)")
-    while time.time() < deadline:
-        for candidate in sorted(USER_DOWNLOADS.glob("sleep-*.csv"), key=lambda p: p.stat().st_mtime, reverse=True):
-            if candidate.name.startswith(pattern):
-                print(f"[ok] Found download: {candidate}")
-                return candidate
-        time.sleep(2)
-    raise TimeoutError(f"No CSV matching {pattern}* found within {timeout} seconds.")
+    candidate = wait_for_file(USER_DOWNLOADS, lambda p: p.name.startswith(pattern), timeout)
+    if candidate is None:
+        raise TimeoutError(f"No CSV matching {pattern}* found within {timeout} seconds.")
+    print(f"[ok] Found download: {candidate}")
+    return candidate
 
 
 def stage_csv(source: Path, target_iso: str) -> Path:
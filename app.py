@@ -1,21 +1,22 @@
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import json
 import logging
 import os
 import shutil
-import subprocess
 import sys
-import time
-import zipfile
+import threading
 import datetime
 import datetime as _dt
 import re
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import requests
-from flask import Blueprint, Flask, jsonify, render_template, request, send_file
+from flask import Blueprint, Flask, Response, g, jsonify, render_template, request, stream_with_context
 from flask_cors import CORS
 
 # ensure local imports work when running as a script
@@ -27,14 +28,18 @@ ROOT = r"C:\Users\blyth\Desktop\Engineering"
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from common.deepcoder import run as deepcoder_run
-from common.dialogue_orchestrator import run_dialogue_test
-from common.query_client import query_model
-from common.rag_store import AgentRAG
-from .garmin_agents_bridge import list_downloaded_files
-from .garmin_pipeline import GARMIN_DATA_PATH, detect_new_files, run_garmin_pipeline
-from .runtime_metrics import record_chat, snapshot as metrics_snapshot
-from .tool_registry import ToolRegistry
+from .runtime_metrics import (
+    mark_startup,
+    record_chat,
+    record_startup,
+    snapshot as metrics_snapshot,
+    startup_report,
+    time_startup,
+    timed_import,
+)
+
+if TYPE_CHECKING:
+    from .tool_registry import ToolRegistry
 
 
 def _load_env_file() -> None:
@@ -51,6 +56,72 @@ def _load_env_file() -> None:
 
 _load_env_file()
 
+
+# Heavy subsystems (LLM clients, RAG, pandas, tool discovery) load on first use
+# or from the warm-up thread so the port binds and /health answers immediately.
+def query_model(prompt: str):
+    return timed_import("common.query_client").query_model(prompt)
+
+
+def deepcoder_run(message: str, intent: str, hits):
+    return timed_import("common.deepcoder").run(message, intent, hits)
+
+
+def run_dialogue_test(turns: int):
+    return timed_import("common.dialogue_orchestrator").run_dialogue_test(turns)
+
+
+# Sky's own subsystems load the same way: importing jobs starts its worker pool
+# and reloads/repairs every persisted record, the garmin modules pull in the
+# parser/bridge chain, and tool_registry scans the tree when first built.
+_SKY_MODULES = (
+    "jobs",
+    "digest_cache",
+    "garmin_inbox",
+    "garmin_history",
+    "garmin_pipeline",
+    "rag_provider",
+    "snapshot_store",
+    "tool_registry",
+)
+
+
+def _sky(name: str):
+    """Sky submodule ``name``, imported (and timed under /metrics/startup) on first use."""
+    return timed_import(f"{__package__}.{name}")
+
+
+def _collection_path() -> Path:
+    return Path(_sky("rag_provider").get_rag().get_collection_path())
+
+
+def _get_registry() -> "ToolRegistry":
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                tool_registry = _sky("tool_registry")
+                with time_startup("tool_registry"):
+                    _REGISTRY = tool_registry.ToolRegistry()
+    return _REGISTRY
+
+
+def _warm_up() -> None:
+    names = ["common.query_client", "common.deepcoder", "common.dialogue_orchestrator", "requests", "pandas"]
+    for name in names + [f"{__package__}.{module}" for module in _SKY_MODULES]:
+        try:
+            timed_import(name)
+        except Exception as exc:
+            logging.warning("Sky warm-up import %s failed: %s", name, exc)
+    try:
+        with time_startup("rag_client"):
+            _sky("rag_provider").get_rag()
+        _get_registry()
+    except Exception as exc:
+        logging.warning("Sky warm-up failed: %s: %s", type(exc).__name__, exc)
+    mark_startup("warm")
+    _WARM.set()
+
 app = Flask(__name__, static_url_path="/static", static_folder="static", template_folder="templates")
 CORS(app)
 logging.basicConfig(level=logging.INFO)
@@ -68,16 +139,21 @@ OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "")
 OWUI_URL = os.getenv("OWUI_URL", "http://127.0.0.1:3000")
 OWUI_MODEL = os.getenv("OWUI_MODEL", "")
 
-SKY_RAG = AgentRAG("Sky")
-TRACE_DIR = Path(SKY_RAG.get_collection_path()) / "traces"
-TRACE_DIR.mkdir(parents=True, exist_ok=True)
-TRACE_FILE = TRACE_DIR / "chat_traces.jsonl"
+_TRACE_FILE: Optional[Path] = None
 SNAPSHOT_GUARD_SECONDS = 5
+# Seconds a restore waits for in-flight RAG requests before giving up.
+RESTORE_DRAIN_TIMEOUT = float(os.getenv("SKY_RESTORE_DRAIN_TIMEOUT", "60"))
+# App routes that use the RAG client hold a lease for the whole request (the
+# sky_rag blueprint does the same for its routes).
+_RAG_ENDPOINTS = {"chat"}
 LAST_ACTIVITY_TS = time.time()
-registry = ToolRegistry()
+_REGISTRY: Optional["ToolRegistry"] = None
+_REGISTRY_LOCK = threading.Lock()
+_WARM = threading.Event()
 SKY_BASELINE_PATH = r"C:\Users\blyth\Desktop\Engineering\Sky\Sky.txt"
 BASELINE_MAX_CHARS = 1200
 LAST_RUN_FILE = r"C:\Users\blyth\Desktop\Engineering\Sky\logs\morning_orchestrator\last.json"
+MORNING_BAT = r"C:\Users\blyth\Desktop\Engineering\Sky\tools\garmin_full_morning.bat"
 
 try:
     from Sky import rag_routes as sky_rag_routes  # app folder now on sys.path
@@ -134,12 +210,11 @@ def _load_baseline_context() -> str:
 
 
 def _list_garmin_staged(n: int = 20) -> Dict[str, Any]:
-    inbox = r"C:\Users\blyth\Desktop\Engineering\Sky\downloads\garmin"
+    garmin_inbox = _sky("garmin_inbox")
+    inbox = str(garmin_inbox.INBOX_DIR)
     try:
-        files = [fn for fn in os.listdir(inbox) if fn.lower().endswith(".csv")]
-        files.sort(key=lambda fn: os.path.getmtime(os.path.join(inbox, fn)), reverse=True)
-        latest = [{"file": fn, "mtime": os.path.getmtime(os.path.join(inbox, fn))} for fn in files[:n]]
-        return {"inbox": inbox, "count": len(files), "latest": latest}
+        latest = [{"file": e["file"], "mtime": e["mtime"]} for e in garmin_inbox.latest(n)]
+        return {"inbox": inbox, "count": garmin_inbox.count(), "latest": latest}
     except Exception as exc:
         return {"error": str(exc), "inbox": inbox}
 
@@ -167,6 +242,46 @@ def _record_last(date_iso: str, digest_path: str, exit_code: int) -> None:
     os.makedirs(os.path.dirname(LAST_RUN_FILE), exist_ok=True)
     with open(LAST_RUN_FILE, "w", encoding="utf-8") as handle:
         json.dump(payload, handle, indent=2)
+    digest_cache = _sky("digest_cache")
+    digest_cache.put("ops:last", LAST_RUN_FILE, payload)
+    digest_cache.invalidate(f"morning:{date_iso}")
+
+
+def _morning_job(iso: str) -> Dict[str, Any]:
+    """Run the full morning sweep for ``iso`` inside a job, logging its output."""
+    digest = rf"C:\Users\blyth\Desktop\Engineering\open-webui-full\backend\data\sky_daily\{iso}.json"
+    env = os.environ.copy()
+    env["PYTHONPATH"] = r"C:\Users\blyth\Desktop\Engineering"
+    # The job's idempotency key replaces the batch file's jobs\morning_<ISO>.lock.
+    jobs = _sky("jobs")
+    env["SKY_JOB_ID"] = jobs.current_job_id() or ""
+    rc = jobs.run_logged([MORNING_BAT, iso], env=env, creationflags=0x08000000)
+    _record_last(iso, digest, rc)
+    # Failing the job (rather than returning a "cooldown" result) keeps the
+    # morning:<ISO> key open, so the next /garmin run retries the date.
+    if rc == 42:
+        raise RuntimeError("Cloudflare 1015 detected (exit code 42); try again later or refresh manually.")
+    if rc != 0:
+        raise RuntimeError(f"runner exited with code {rc}")
+    return {
+        "date": iso,
+        "exit_code": rc,
+        "digest_exists": os.path.exists(digest),
+        "digest_path": digest,
+    }
+
+
+def _submit_morning(iso: str, force: bool = False) -> Dict[str, Any]:
+    jobs = _sky("jobs")
+    job_id = jobs.submit("morning", _morning_job, iso, idempotency_key=f"morning:{iso}", force=force)
+    job = jobs.get(job_id) or {}
+    return {
+        "date": iso,
+        "job_id": job_id,
+        "status": job.get("status"),
+        "status_url": f"/jobs/{job_id}",
+        "log_url": f"/jobs/{job_id}/log",
+    }
 
 
 def _handle_garmin_command(message: str) -> Optional[Dict[str, Any]]:
@@ -179,7 +294,7 @@ def _handle_garmin_command(message: str) -> Optional[Dict[str, Any]]:
     if "help" in m:
         return {
             "cmd": "garmin.help",
-            "usage": "/garmin status | /garmin files | /garmin run [today|yesterday|YYYY-MM-DD]",
+            "usage": "/garmin status | /garmin files | /garmin run [today|yesterday|YYYY-MM-DD] [force]",
         }
 
     iso = _resolve_iso_from_text(m)
@@ -198,30 +313,31 @@ def _handle_garmin_command(message: str) -> Optional[Dict[str, Any]]:
         return {"cmd": "garmin.files", "date": iso, "staged": _list_garmin_staged()}
 
     if "run" in m or "full_run" in m:
-        bat = r"C:\Users\blyth\Desktop\Engineering\Sky\tools\garmin_full_morning.bat"
-        env = os.environ.copy()
-        env["PYTHONPATH"] = r"C:\Users\blyth\Desktop\Engineering"
         try:
-            rc = subprocess.call([bat, iso], env=env, creationflags=0x08000000)
+            return {"cmd": "garmin.run", **_submit_morning(iso, force="force" in m)}
         except Exception as exc:
             return {"cmd": "garmin.run", "date": iso, "status": "error", "error": str(exc)}
-        digest = rf"C:\Users\blyth\Desktop\Engineering\open-webui-full\backend\data\sky_daily\{iso}.json"
-        _record_last(iso, digest, rc)
-        return {
-            "cmd": "garmin.run",
-            "date": iso,
-            "exit_code": rc,
-            "digest_exists": os.path.exists(digest),
-            "digest_path": digest,
-        }
 
     return {
         "cmd": "garmin.help",
-        "usage": "/garmin status | /garmin files | /garmin run [today|yesterday|YYYY-MM-DD]",
+        "usage": "/garmin status | /garmin files | /garmin run [today|yesterday|YYYY-MM-DD] [force]",
     }
 
 
-def _handle_morning_command(message: str) -> Optional[Dict[str, Any]]:
+def _morning_show_view(iso: str):
+    def project(data: Dict[str, Any]) -> Dict[str, Any]:
+        slim = {
+            "date": iso,
+            "sleep_review": data.get("sleep_review"),
+            "good_word_of_advice": data.get("good_word_of_advice"),
+        }
+        return {"cmd": "morning.show", "exists": True, "data": slim}
+
+    return project
+
+
+def _handle_morning_command(message: str) -> Optional[Any]:
+    """Answer /morning shortcuts; ``show`` returns a pre-rendered JSON Response from the digest cache."""
     if not message:
         return None
     m = message.strip().lower()
@@ -232,19 +348,13 @@ def _handle_morning_command(message: str) -> Optional[Dict[str, Any]]:
     if "path" in m:
         return {"cmd": "morning.path", "date": iso, "digest_path": digest, "exists": os.path.exists(digest)}
     if "show" in m:
-        if not os.path.exists(digest):
-            return {"cmd": "morning.show", "date": iso, "exists": False}
         try:
-            with open(digest, "r", encoding="utf-8") as handle:
-                data = json.load(handle)
-            slim = {
-                "date": iso,
-                "sleep_review": data.get("sleep_review"),
-                "good_word_of_advice": data.get("good_word_of_advice"),
-            }
-            return {"cmd": "morning.show", "exists": True, "data": slim}
+            cached = _sky("digest_cache").get(f"morning:{iso}", digest, _morning_show_view(iso))
         except Exception as exc:
             return {"cmd": "morning.show", "error": repr(exc)}
+        if cached is None:
+            return {"cmd": "morning.show", "date": iso, "exists": False}
+        return Response(cached[1], mimetype="application/json")
     return {"cmd": "morning.help", "usage": "/morning show [date] | /morning path [date]"}
 
 
@@ -277,35 +387,10 @@ def _handle_nlu_morning(message: str) -> Optional[Dict[str, Any]]:
                 iso = token
                 break
 
-        bat = r"C:\Users\blyth\Desktop\Engineering\Sky\tools\garmin_full_morning.bat"
-        digest = rf"C:\Users\blyth\Desktop\Engineering\open-webui-full\backend\data\sky_daily\{iso}.json"
-        env = os.environ.copy()
-        env["PYTHONPATH"] = r"C:\Users\blyth\Desktop\Engineering"
         try:
-            rc = subprocess.call([bat, iso], env=env, creationflags=0x08000000)
-            resp: Dict[str, Any] = {
-                "intent": "morning.run",
-                "ok": rc == 0,
-                "date": iso,
-                "exit_code": rc,
-                "digest_exists": os.path.exists(digest),
-                "digest_path": digest,
-            }
-            _record_last(iso, digest, rc)
-            if rc == 42:
-                resp["status"] = "cooldown"
-                resp["hint"] = "Cloudflare 1015 detected; try again later or refresh manually."
-            if rc not in (0, 42):
-                resp["error"] = f"runner exited with code {rc}"
-            return resp
+            return {"intent": "morning.run", "ok": True, **_submit_morning(iso)}
         except Exception as exc:
-            return {
-                "intent": "morning.run",
-                "ok": False,
-                "date": iso,
-                "error": f"subprocess failed: {exc!r}",
-                "digest_path": digest,
-            }
+            return {"intent": "morning.run", "ok": False, "date": iso, "error": f"job submit failed: {exc!r}"}
     except Exception as exc:
         return {"intent": "morning.run", "ok": False, "error": f"nlu handler error: {exc!r}"}
 
@@ -411,7 +496,7 @@ def gather_hits(intent: str, message: str, depth: str):
     else:
         top_k = base_top
 
-    res = SKY_RAG.search(query=message, top_k=search_top, kinds=kinds)
+    res = _sky("rag_provider").get_rag().search(query=message, top_k=search_top, kinds=kinds)
     hits = res.get("results", [])
     if intent == "ops_action":
         hits = [
@@ -428,6 +513,15 @@ def gather_hits(intent: str, message: str, depth: str):
     return hits[:top_k], top_k
 
 
+def _trace_file() -> Path:
+    global _TRACE_FILE
+    if _TRACE_FILE is None:
+        trace_dir = _collection_path() / "traces"
+        trace_dir.mkdir(parents=True, exist_ok=True)
+        _TRACE_FILE = trace_dir / "chat_traces.jsonl"
+    return _TRACE_FILE
+
+
 def log_trace(
     intent: str,
     depth: str,
@@ -453,7 +547,7 @@ def log_trace(
         "latency_ms": round(latency_ms, 2),
         "chain": chain,
     }
-    with open(TRACE_FILE, "a", encoding="utf-8") as fh:
+    with open(_trace_file(), "a", encoding="utf-8") as fh:
         fh.write(json.dumps(record, ensure_ascii=False) + "\n")
 
 
@@ -464,10 +558,24 @@ def _can_snapshot() -> bool:
 @app.before_request
 def _track_activity():
     global LAST_ACTIVITY_TS
-    if request.endpoint not in {"rag_snapshot", "rag_restore"}:
+    mark_startup("first_request")
+    if request.endpoint not in {"rag_snapshot", "rag_snapshot_status", "rag_snapshots", "rag_restore"}:
         LAST_ACTIVITY_TS = time.time()
 
 
+@app.before_request
+def _lease_rag():
+    if request.endpoint in _RAG_ENDPOINTS:
+        _sky("rag_provider").acquire()
+        g.rag_lease = True
+
+
+@app.teardown_request
+def _release_rag(_exc=None):
+    if g.pop("rag_lease", False):
+        _sky("rag_provider").release()
+
+
 @app.route("/")
 def home():
     return render_template("index.html", agent=AGENT_NAME)
@@ -475,13 +583,14 @@ def home():
 
 @app.route("/health")
 def health():
-    return jsonify({"status": "ok", "ts": datetime.utcnow().isoformat() + "Z"})
+    return jsonify({"status": "ok", "warm": _WARM.is_set(), "ts": datetime.utcnow().isoformat() + "Z"})
 
 
 @app.route("/meta")
 def meta():
     ollama_ok, ollama_version = False, None
     try:
+        requests = timed_import("requests")
         r = requests.get(f"{OLLAMA_URL}/api/version", timeout=2)
         if r.ok:
             ollama_ok = True
@@ -512,6 +621,8 @@ def chat():
         return jsonify(override), 200
 
     morning_override = _handle_morning_command(user_msg)
+    if isinstance(morning_override, Response):
+        return morning_override, 200
     if morning_override is not None:
         return jsonify(morning_override), 200
 
@@ -599,7 +710,15 @@ def chat():
 
 @app.route("/metrics")
 def metrics():
-    return jsonify(metrics_snapshot())
+    payload = metrics_snapshot()
+    payload["sky_rag_client"] = _sky("rag_provider").stats()
+    payload["sky_digest_cache"] = _sky("digest_cache").stats()
+    return jsonify(payload)
+
+
+@app.route("/metrics/startup")
+def metrics_startup():
+    return jsonify({"warm": _WARM.is_set(), **startup_report()})
 
 
 @app.route("/dialogue/test", methods=["GET", "POST"])
@@ -612,43 +731,136 @@ def dialogue_test():
 
 @app.route("/tools", methods=["GET"])
 def list_tools():
+    registry = _get_registry()
     registry.refresh()
-    payload = {"registry_file": str(ToolRegistry.REGISTRY_FILE), "tools": registry.list_tools()}
+    payload = {"registry_file": str(registry.REGISTRY_FILE), "tools": registry.list_tools()}
     return jsonify(payload), 200
 
 
+@app.route("/tools/search", methods=["GET"])
+def search_tools():
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"ok": False, "error": "q required"}), 400
+    registry = _get_registry()
+    registry.refresh()
+    limit = max(1, min(request.args.get("limit", 10, type=int), 50))
+    private = request.args.get("private", "0") == "1"
+    return jsonify({"ok": True, "query": query, "results": registry.search(query, limit=limit, include_private=private)}), 200
+
+
+def _garmin_job_response(kind: str, fn, *args, **kwargs):
+    jobs = _sky("jobs")
+    running = jobs.active(kind)
+    job_id = running["id"] if running else jobs.submit(kind, fn, *args, **kwargs)
+    return jsonify({"ok": True, "job_id": job_id, "status_url": f"/jobs/{job_id}", "log_url": f"/jobs/{job_id}/log"}), 202
+
+
+def _workers_arg(body: Dict[str, Any]) -> Optional[int]:
+    """``workers`` from a request body as an int in [1, cpu_count]; None when absent."""
+    value = body.get("workers")
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError("workers must be an integer")
+    try:
+        workers = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("workers must be an integer") from None
+    return max(1, min(workers, os.cpu_count() or 1))
+
+
 @app.route("/garmin/run", methods=["POST"])
 def garmin_run():
-    result = run_garmin_pipeline()
-    return jsonify(result), 200
+    body = request.get_json(silent=True) or {}
+    try:
+        workers = _workers_arg(body)
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
+    return _garmin_job_response("garmin.run", _sky("garmin_pipeline").run_garmin_pipeline, workers=workers)
 
 
 @app.route("/garmin/status", methods=["GET"])
 def garmin_status():
-    GARMIN_DATA_PATH.mkdir(parents=True, exist_ok=True)
-    files = sorted(os.listdir(GARMIN_DATA_PATH))
-    pending = detect_new_files()
+    pipeline = _sky("garmin_pipeline")
+    pipeline.GARMIN_DATA_PATH.mkdir(parents=True, exist_ok=True)
+    files = sorted(os.listdir(pipeline.GARMIN_DATA_PATH))
+    pending = pipeline.detect_new_files()
     return jsonify({
         "files": files,
         "pending_new": pending,
-        "data_path": str(GARMIN_DATA_PATH),
-        "downloaded_files": list_downloaded_files(),
+        "data_path": str(pipeline.GARMIN_DATA_PATH),
+        "downloaded_files": _sky("garmin_agents_bridge").list_downloaded_files(),
     }), 200
 
 
 @app.route("/garmin/full_run", methods=["POST"])
 def garmin_full_run():
     body = request.get_json(silent=True) or {}
-    ensure = body.get("ensure_download", True)
-    result = run_garmin_pipeline(ensure_download=bool(ensure))
-    result["ensure_download"] = bool(ensure)
-    return jsonify(result), 200
+    ensure = bool(body.get("ensure_download", True))
+    try:
+        workers = _workers_arg(body)
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
+    return _garmin_job_response(
+        "garmin.full_run", _sky("garmin_pipeline").run_garmin_pipeline, ensure_download=ensure, workers=workers
+    )
+
+
+@app.route("/garmin/history", methods=["GET"])
+def garmin_history_query():
+    columns = [c.strip() for c in (request.args.get("columns") or "").split(",") if c.strip()]
+    try:
+        start = _dt.date.fromisoformat(request.args["start"]) if request.args.get("start") else None
+        end = _dt.date.fromisoformat(request.args["end"]) if request.args.get("end") else None
+        frame = _sky("garmin_history").query(columns or None, start=start, end=end)
+    except ValueError as exc:
+        return jsonify({"ok": False, "error": str(exc)}), 400
+    frame["date"] = frame["date"].dt.strftime("%Y-%m-%d")
+    rows = json.loads(frame.to_json(orient="records"))
+    return jsonify({"ok": True, "nights": len(rows), "rows": rows}), 200
+
+
+@app.route("/garmin/history/trend", methods=["GET"])
+def garmin_history_trend():
+    column = request.args.get("column", "deep_min")
+    garmin_history = _sky("garmin_history")
+    if garmin_history.SCHEMA.get(column) != "float64":
+        return jsonify({"ok": False, "error": f"not a numeric history column: {column}"}), 400
+    days = max(1, request.args.get("days", 90, type=int))
+    return jsonify({"ok": True, **garmin_history.trend(column, days=days)}), 200
 
 
 @app.route("/garmin/files", methods=["GET"])
 def garmin_files():
-    GARMIN_DATA_PATH.mkdir(parents=True, exist_ok=True)
-    return jsonify({"files": list_downloaded_files(), "data_path": str(GARMIN_DATA_PATH)}), 200
+    data_path = _sky("garmin_pipeline").GARMIN_DATA_PATH
+    data_path.mkdir(parents=True, exist_ok=True)
+    return jsonify({"files": _sky("garmin_agents_bridge").list_downloaded_files(), "data_path": str(data_path)}), 200
+
+
+@app.route("/jobs", methods=["GET"])
+def jobs_index():
+    limit = max(1, min(request.args.get("limit", 50, type=int), 500))
+    return jsonify({"jobs": _sky("jobs").list_jobs(request.args.get("kind"), limit=limit)}), 200
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str):
+    job = _sky("jobs").get(job_id)
+    if not job:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job), 200
+
+
+@app.route("/jobs/<job_id>/log", methods=["GET"])
+def job_log(job_id: str):
+    jobs = _sky("jobs")
+    if not jobs.get(job_id):
+        return jsonify({"error": "unknown job"}), 404
+    offset = max(0, request.args.get("offset", 0, type=int))
+    follow = request.args.get("follow", "1") == "1"
+    stream = jobs.follow_log(job_id, offset=offset, follow=follow)
+    return Response(stream_with_context(stream), mimetype="text/plain")
 
 
 ops_bp = Blueprint("sky_ops", __name__)
@@ -656,10 +868,10 @@ ops_bp = Blueprint("sky_ops", __name__)
 
 @ops_bp.route("/ops/last", methods=["GET"])
 def ops_last():
-    if not os.path.exists(LAST_RUN_FILE):
+    cached = _sky("digest_cache").get("ops:last", LAST_RUN_FILE)
+    if cached is None:
         return jsonify({"status": "none"}), 404
-    with open(LAST_RUN_FILE, "r", encoding="utf-8") as handle:
-        return jsonify(json.load(handle))
+    return Response(cached[1], mimetype="application/json")
 
 
 app.register_blueprint(ops_bp)
@@ -667,51 +879,100 @@ app.register_blueprint(ops_bp)
 
 @app.route("/rag/snapshot", methods=["GET"])
 def rag_snapshot():
+    jobs = _sky("jobs")
+    if jobs.active("restore"):
+        return jsonify({"error": "Restore in progress; try again once it finishes."}), 409
+    running = jobs.active("snapshot")
+    if running:
+        return jsonify({"ok": True, "job_id": running["id"], "status": running["status"]}), 202
     if not _can_snapshot():
         return jsonify({"error": "Recent activity detected. Pause traffic before snapshot."}), 409
-    base_path = Path(SKY_RAG.get_collection_path())
-    snap_dir = base_path / "snapshots"
-    snap_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    snapshot_path = snap_dir / f"sky_snapshot_{timestamp}.zip"
-    with zipfile.ZipFile(snapshot_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for root, _, files in os.walk(base_path):
-            for file in files:
-                full_path = Path(root) / file
-                arcname = full_path.relative_to(base_path)
-                zf.write(full_path, arcname)
-    return send_file(str(snapshot_path), as_attachment=True, download_name=snapshot_path.name)
+    job_id = jobs.submit("snapshot", _sky("snapshot_store").create_snapshot, _collection_path())
+    return jsonify({"ok": True, "job_id": job_id, "status_url": f"/rag/snapshot/status/{job_id}"}), 202
+
+
+@app.route("/rag/snapshot/status/<job_id>", methods=["GET"])
+def rag_snapshot_status(job_id: str):
+    job = _sky("jobs").get(job_id)
+    if not job:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job), 200
+
+
+@app.route("/rag/snapshots", methods=["GET"])
+def rag_snapshots():
+    return jsonify({"snapshots": _sky("snapshot_store").list_snapshots(_collection_path())}), 200
+
+
+def _restore_job(source: Dict[str, str]) -> Dict[str, Any]:
+    global _TRACE_FILE
+    rag_provider, snapshot_store = _sky("rag_provider"), _sky("snapshot_store")
+    base_path = _collection_path()
+    staging = base_path.with_name(f"{base_path.name}.restore-{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}")
+    staging.mkdir(parents=True)
+    try:
+        if source.get("snapshot"):
+            unpacked = snapshot_store.materialize(base_path, source["snapshot"], staging)
+        else:
+            unpacked = snapshot_store.extract_zip(Path(source["path"]), staging)
+        checks = snapshot_store.validate_staging(staging)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # In-flight requests finish on the old client; new ones wait. The old client
+    # is closed before the rename (Windows refuses to move open files) and the
+    # retired directory is deleted only once nothing can reach it.
+    try:
+        with rag_provider.exclusive(timeout=RESTORE_DRAIN_TIMEOUT):
+            rag_provider.retire_rag()
+            try:
+                retired = snapshot_store.swap_directories(base_path, staging)
+            finally:
+                rag_provider.swap_rag(rag_provider.build_rag())
+                _TRACE_FILE = None
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    shutil.rmtree(retired, ignore_errors=True)
+    return {"restored": True, "source": source, "unpacked": unpacked, "checks": checks}
 
 
 @app.route("/rag/restore", methods=["POST"])
 def rag_restore():
-    global SKY_RAG, TRACE_DIR, TRACE_FILE
     if not _can_snapshot():
         return jsonify({"error": "Recent activity detected. Pause traffic before restore."}), 409
+    jobs = _sky("jobs")
+    if jobs.active("snapshot") or jobs.active("restore"):
+        return jsonify({"error": "A snapshot or restore job is already running."}), 409
     body = request.get_json(force=True) or {}
+    snapshot_id = body.get("snapshot")
     path = body.get("path")
-    if not path or not os.path.exists(path):
+    if snapshot_id:
+        if snapshot_id not in _sky("snapshot_store").list_snapshots(_collection_path()):
+            return jsonify({"error": "Unknown snapshot id"}), 400
+        source = {"snapshot": snapshot_id}
+    elif path and os.path.exists(path):
+        source = {"path": path}
+    else:
         return jsonify({"error": "Snapshot path invalid"}), 400
 
-    try:
-        sky_rag_routes.RAG.client.delete_collection(sky_rag_routes.RAG.col.name)
-    except Exception:
-        pass
+    job_id = jobs.submit("restore", _restore_job, source)
+    return jsonify({"ok": True, "job_id": job_id, "status_url": f"/rag/snapshot/status/{job_id}"}), 202
 
-    base_path = Path(SKY_RAG.get_collection_path())
-    shutil.rmtree(base_path, ignore_errors=True)
-    os.makedirs(base_path, exist_ok=True)
-    with zipfile.ZipFile(path, "r") as zf:
-        zf.extractall(base_path)
 
-    SKY_RAG = AgentRAG("Sky")
-    sky_rag_routes.RAG = AgentRAG("Sky")
-    TRACE_DIR = Path(SKY_RAG.get_collection_path()) / "traces"
-    TRACE_DIR.mkdir(parents=True, exist_ok=True)
-    TRACE_FILE = TRACE_DIR / "chat_traces.jsonl"
-    return jsonify({"ok": True, "restored": True})
+record_startup("import:Sky.app", (time.perf_counter() - _IMPORT_START) * 1000.0)
+mark_startup("app_imported")
 
 
 if __name__ == "__main__":
+    if os.getenv("SKY_GARMIN_WATCH", "0") == "1":
+        from .garmin_watcher import GarminWatcher
+
+        GarminWatcher().start()
+    if os.getenv("SKY_LAZY_STARTUP", "1") == "1":
+        threading.Thread(target=_warm_up, name="sky-warm-up", daemon=True).start()
+    else:
+        _warm_up()
     app.run(host="0.0.0.0", port=5011, debug=False, threaded=True)
 
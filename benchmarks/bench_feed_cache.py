@@ -0,0 +1,128 @@
+"""Feed cache behaviour against a local stand-in server: TTL hits, conditional GETs, stale fallback.
+
+    python benchmarks/bench_feed_cache.py --items 200 --repeat 20
+
+Starts an http.server on 127.0.0.1 that serves one RSS feed with an ETag and
+Last-Modified, answers a matching If-None-Match with 304, and can be switched
+to fail with 500. morning_reporter's cache lives in a temporary directory.
+Each phase checks the ``source`` _fetch_feed reports, what the server saw,
+and the time per fetch; the script exits non-zero if any check fails.
+"""
+import argparse
+import datetime
+import email.utils
+import http.server
+import importlib
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SKY_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKY_DIR / "agents"))
+reporter = importlib.import_module("morning_reporter")
+
+ETAG = '"feed-v1"'
+LAST_MODIFIED = "Mon, 13 Oct 2025 07:00:00 GMT"
+
+
+class _Feed(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    items = 40
+    fail = False
+    hits = {"200": 0, "304": 0, "500": 0}
+    conditional = []
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes = b"") -> None:
+        type(self).hits[str(status)] += 1
+        self.send_response(status)
+        if status != 500:
+            self.send_header("ETag", ETAG)
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if type(self).fail:
+            self._send(500)
+            return
+        type(self).conditional.append((self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+        if self.headers.get("If-None-Match") == ETAG:
+            self._send(304)
+            return
+        now = datetime.datetime.now(datetime.timezone.utc)
+        entries = "".join(
+            f"<item><title>story {i}</title><link>http://example.test/{i}</link>"
+            f"<description>summary {i}</description>"
+            f"<pubDate>{email.utils.format_datetime(now - datetime.timedelta(minutes=10 * i))}</pubDate></item>"
+            for i in range(type(self).items)
+        )
+        self._send(200, f"<?xml version='1.0'?><rss><channel>{entries}</channel></rss>".encode("utf-8"))
+
+
+def _fetch(url: str, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        items, stat = reporter._fetch_feed(url, time.monotonic() + 10.0)
+    return items, stat, (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    _Feed.items = args.items
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Feed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/feed.xml"
+    failures = 0
+
+    def check(label: str, ok: bool, detail: str) -> None:
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {label:<14} {detail}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reporter.FEED_CACHE_DIR = Path(tmp)
+        reporter.FEED_MAX_ITEMS = max(reporter.FEED_MAX_ITEMS, args.items)
+
+        reporter.FEED_CACHE_TTL = 0.0
+        items, stat, network = _fetch(url, 1)
+        check("network", stat.get("source") == "network" and len(items) == args.items and _Feed.hits["200"] == 1,
+              f"source={stat.get('source')} items={len(items)} 200s={_Feed.hits['200']}  {network * 1e3:7.2f} ms")
+
+        reporter.FEED_CACHE_TTL = 900.0
+        before = dict(_Feed.hits)
+        items, stat, cached = _fetch(url, args.repeat)
+        check("ttl-hit", stat.get("source") == "cache" and _Feed.hits == before and len(items) == args.items,
+              f"source={stat.get('source')} requests={sum(_Feed.hits.values()) - sum(before.values())}  {cached * 1e3:7.2f} ms")
+
+        reporter.FEED_CACHE_TTL = 0.0
+        _Feed.conditional.clear()
+        items, stat, revalidated = _fetch(url, args.repeat)
+        sent = _Feed.conditional[-1] if _Feed.conditional else (None, None)
+        check("not-modified", stat.get("source") == "not-modified" and sent == (ETAG, LAST_MODIFIED)
+              and _Feed.hits["304"] == args.repeat and len(items) == args.items,
+              f"source={stat.get('source')} 304s={_Feed.hits['304']} validators={sent}  {revalidated * 1e3:7.2f} ms")
+
+        _Feed.fail = True
+        items, stat, _ = _fetch(url, 1)
+        check("stale-cache", stat.get("source") == "stale-cache" and len(items) == args.items and "error" in stat,
+              f"source={stat.get('source')} items={len(items)} error={stat.get('error')!r}")
+
+    server.shutdown()
+    print(f"items={args.items} repeat={args.repeat}  network {network * 1e3:.2f} ms  "
+          f"cache {cached * 1e3:.2f} ms  304 {revalidated * 1e3:.2f} ms")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
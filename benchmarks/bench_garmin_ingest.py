@@ -0,0 +1,81 @@
+"""Files/sec for run_garmin_pipeline across worker counts.
+
+    python benchmarks/bench_garmin_ingest.py --files 365 --workers 1 2 4 8 --repeat 5
+
+Synthetic nightly exports are generated from the sample CSV in
+data/garmin_downloads into a temporary directory; nothing under the real
+Sky paths is touched. One discarded warm-up run pays for imports and the
+first process-pool spawn, then each worker count is run ``--repeat`` times
+on a fresh directory and the median is reported (best in brackets).
+"""
+import argparse
+import datetime
+import importlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SKY_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKY_DIR.parent))
+pipeline = importlib.import_module(f"{SKY_DIR.name}.garmin_pipeline")
+history = importlib.import_module(f"{SKY_DIR.name}.garmin_history")
+
+SAMPLE = SKY_DIR / "data" / "garmin_downloads" / "sleep-2025-10-31-Sleep.csv"
+
+
+def _seed(dest: Path, count: int) -> None:
+    template = SAMPLE.read_text(encoding="utf-8-sig")
+    start = datetime.date(2024, 1, 1)
+    for i in range(count):
+        iso = (start + datetime.timedelta(days=i)).isoformat()
+        body = template.replace("2025-10-31", iso).replace("Restless Moments,42", f"Restless Moments,{20 + i % 50}")
+        (dest / f"sleep-{iso}.csv").write_text(body, encoding="utf-8")
+
+
+def _point_pipeline_at(root: Path) -> None:
+    pipeline.GARMIN_DATA_PATH = root / "data"
+    pipeline.GARMIN_REPORT_PATH = root / "reports"
+    pipeline.GARMIN_LOG_PATH = root / "logs"
+    pipeline.GARMIN_STATE_FILE = root / "logs" / "garmin_pipeline_state.json"
+    history.HISTORY_PATH = root / "history"
+    pipeline._DIGEST_CACHE.clear()
+    pipeline._ensure_dirs()
+
+
+def _run_once(files: int, workers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        _point_pipeline_at(Path(tmp))
+        _seed(pipeline.GARMIN_DATA_PATH, files)
+        start = time.perf_counter()
+        result = pipeline.run_garmin_pipeline(workers=workers)
+        return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=120)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    counts = sorted(set(args.workers))
+
+    print(f"cpus={os.cpu_count()} files={args.files} repeat={args.repeat}")
+    _run_once(min(args.files, 20), max(counts))  # warm-up, discarded
+    baseline = None
+    for workers in counts:
+        runs = [_run_once(args.files, workers) for _ in range(max(1, args.repeat))]
+        median = statistics.median(elapsed for elapsed, _ in runs)
+        best = min(elapsed for elapsed, _ in runs)
+        done = runs[-1][1]["completed_reports"]
+        rate = done / median
+        baseline = baseline or rate
+        print(
+            f"workers={workers:<3} files/sec={rate:8.1f} (best {done / best:8.1f})  speedup={rate / baseline:4.2f}x  "
+            f"median={median:6.2f}s  errors={max(len(r['errors']) for _, r in runs)}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Per-file parse cost: shared garmin_format parser vs the old pandas path.
+
+    python benchmarks/bench_garmin_parse.py --repeat 500
+
+The old path is what garmin_pipeline.load_csv + generate_report used to do:
+pd.read_csv, column normalisation and df.describe(include="all").
+"""
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+SKY_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKY_DIR.parent))
+garmin_format = importlib.import_module(f"{SKY_DIR.name}.garmin_format")
+
+SAMPLE = SKY_DIR / "data" / "garmin_downloads" / "sleep-2025-10-31-Sleep.csv"
+
+
+def _pandas_path(path: Path) -> dict:
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
+    return df.describe(include="all").to_dict()
+
+
+def _time(fn, path: Path, repeat: int) -> float:
+    fn(path)  # warm imports and the page cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(path)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--file", type=Path, default=SAMPLE)
+    args = parser.parse_args()
+
+    import_start = time.perf_counter()
+    import pandas  # noqa: F401
+
+    pandas_import = time.perf_counter() - import_start
+    shared = _time(garmin_format.parse_file, args.file, args.repeat)
+    legacy = _time(_pandas_path, args.file, args.repeat)
+    print(f"file={args.file.name} repeat={args.repeat}")
+    print(f"garmin_format.parse_file  {shared * 1e6:10.1f} us/file")
+    print(f"pandas read_csv+describe  {legacy * 1e6:10.1f} us/file  (+{pandas_import * 1e3:.0f} ms one-off pandas import)")
+    print(f"speedup                   {legacy / shared:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""morning_reporter parse step: precompiled lookups vs the previous per-call regex/set work.
+
+    python benchmarks/bench_reporter_parse.py --rows 2000 --repeat 20
+
+Times the column lookups and duration parsing on the sample Garmin exports
+plus two generated layouts the generic path handles (single-row summary,
+stage timeline), and _parse_latest_metrics end to end on each sample.
+"before" re-runs the previous _to_minutes/_get_by_syn implementation, kept
+below verbatim, on the same rows. The inbox and its index live in a
+temporary directory; nothing under the real Sky paths is touched.
+"""
+import argparse
+import csv
+import importlib
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+SKY_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKY_DIR / "agents"))
+reporter = importlib.import_module("morning_reporter")
+garmin_inbox = reporter.garmin_inbox
+
+SAMPLES = sorted((SKY_DIR / "data" / "garmin_downloads").glob("*.csv"))
+
+
+# --- previous implementation -------------------------------------------------
+
+def _legacy_norm(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", (s or "").lower())
+
+
+def _legacy_to_minutes(val: Optional[str]) -> Optional[float]:
+    if val is None:
+        return None
+    s = str(val).strip()
+    if s == "" or s.lower() in ("nan", "none", "null"):
+        return None
+    try:
+        return float(s.replace(",", ""))
+    except Exception:
+        pass
+    if re.match(r"^\d+:\d{2}(:\d{2})?$", s):
+        parts = [int(p) for p in s.split(":")]
+        if len(parts) == 2:
+            return parts[0] * 60 + parts[1]
+        if len(parts) == 3:
+            return parts[0] * 60 + parts[1] + parts[2] / 60.0
+    m = re.match(r"(?i)^\s*(?:(\d+)\s*h(?:ours?)?)?\s*(?:(\d+)\s*m(?:in(?:utes?)?)?)?\s*$", s)
+    if m and (m.group(1) or m.group(2)):
+        return int(m.group(1) or 0) * 60 + int(m.group(2) or 0)
+    if re.match(r"^\d+(\.\d+)?\s*s(ec|econds)?$", s, re.I):
+        return float(re.sub(r"[^0-9.]+", "", s)) / 60.0
+    return None
+
+
+def _legacy_get_by_syn(row: Dict[str, str], keys: set) -> Optional[float]:
+    for k, v in row.items():
+        if _legacy_norm(k) in {_legacy_norm(x) for x in keys}:
+            return _legacy_to_minutes(v)
+    return None
+
+
+def _legacy_rows(rows, cols):
+    stage_key = next((k for k in cols if _legacy_norm(k) in {_legacy_norm(x) for x in reporter.SYN["stage"]}), None)
+    dur_key = next((k for k in cols if _legacy_norm(k) in {_legacy_norm(x) for x in reporter.SYN["duration"]}), None)
+    for r in rows:
+        for metric in ("totalsleep", "deep", "rem", "light", "awake", "hrv"):
+            _legacy_get_by_syn(r, reporter.SYN[metric])
+        if stage_key and dur_key:
+            _legacy_norm(r.get(stage_key, ""))
+            _legacy_to_minutes(r.get(dur_key))
+
+
+def _current_rows(rows, cols):
+    colmap = reporter._column_map(cols)
+    stage_key, dur_key = colmap.get("stage"), colmap.get("duration")
+    for r in rows:
+        for metric in ("totalsleep", "deep", "rem", "light", "awake", "hrv"):
+            reporter._get_by_syn(r, colmap, metric)
+        if stage_key and dur_key:
+            reporter._norm(r.get(stage_key, ""))
+            reporter._to_minutes(r.get(dur_key))
+
+
+# --- fixtures ----------------------------------------------------------------
+
+def _write_layouts(dest: Path, rows: int) -> Dict[str, Path]:
+    summary = dest / "sleep-2025-01-01-summary.csv"
+    with summary.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Date", "Total Sleep Time", "Deep Sleep", "REM Sleep", "Light Sleep", "Awake Minutes", "Sleep Score", "Average HRV"])
+        for i in range(rows):
+            writer.writerow([f"2025-01-{1 + i % 28:02d}", "7h 12m", "1:35", "95", "4h 2m", "14", "81", "44"])
+    timeline = dest / "sleep-2025-01-02-timeline.csv"
+    with timeline.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["Start", "Sleep Stage", "Duration"])
+        stages = ["Light", "Deep", "Light", "REM", "Awake"]
+        for i in range(rows):
+            writer.writerow([f"00:{i % 60:02d}", stages[i % len(stages)], f"{(i % 40) + 1}m"])
+    return {"summary": summary, "timeline": timeline}
+
+
+def _time(fn, *args, repeat: int) -> float:
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = Path(tmp) / "inbox"
+        inbox.mkdir()
+        files = _write_layouts(inbox, args.rows)
+        for sample in SAMPLES:
+            shutil.copy2(sample, inbox / sample.name)
+        reporter.GARMIN_DIR = inbox
+        garmin_inbox.INDEX_PATH = Path(tmp) / "garmin_inbox_index.json"
+        garmin_inbox._MEMO.clear()
+
+        print(f"rows={args.rows} repeat={args.repeat}")
+        for label, path in files.items():
+            cols, rows = reporter._sniff_reader(path)
+            before = _time(_legacy_rows, rows, cols, repeat=args.repeat)
+            after = _time(_current_rows, rows, cols, repeat=args.repeat)
+            print(f"{label:<9} lookups+durations  before {before * 1e3:8.2f} ms  after {after * 1e3:8.2f} ms  ({before / after:4.1f}x)")
+        for sample in SAMPLES:
+            cols, rows = reporter._sniff_reader(inbox / sample.name)
+            before = _time(_legacy_rows, rows, cols, repeat=args.repeat)
+            after = _time(_current_rows, rows, cols, repeat=args.repeat)
+            elapsed = _time(reporter._parse_latest_metrics, sample.stem.split("sleep-")[-1][:10], repeat=args.repeat)
+            print(
+                f"sample    {sample.name}: lookups+durations  before {before * 1e6:8.1f} us  after {after * 1e6:8.1f} us  "
+                f"({before / after:4.1f}x)  _parse_latest_metrics {elapsed * 1e6:8.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
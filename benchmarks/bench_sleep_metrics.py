@@ -0,0 +1,116 @@
+"""Derived sleep metrics over a multi-year history: per-row dict loops vs derive_metrics.
+
+    python benchmarks/bench_sleep_metrics.py --years 5 --repeat 3
+
+A synthetic nightly history (with skipped nights and missing values) is
+generated in memory. "per-row" runs sleep_analytics.derive on every record
+and then builds each night's 7/30/90-day medians and 30-day z-score from the
+prior nights in plain Python, the way summary() does for a single night.
+"vectorized" is one derive_metrics call. Both outputs are compared.
+"""
+import argparse
+import bisect
+import datetime
+import importlib
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+SKY_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SKY_DIR.parent))
+analytics = importlib.import_module(f"{SKY_DIR.name}.sleep_analytics")
+
+import pandas as pd  # noqa: E402
+
+
+def _synthetic(years: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    rows = []
+    day = datetime.date(2024, 1, 1) - datetime.timedelta(days=365 * years)
+    for _ in range(365 * years):
+        day += datetime.timedelta(days=1 if rng.random() > 0.1 else 2)
+        total = rng.gauss(420, 40) if rng.random() > 0.03 else None
+        rows.append({
+            "date": day,
+            "total_min": total,
+            "deep_min": total * rng.gauss(0.2, 0.03) if total and rng.random() > 0.05 else None,
+            "rem_min": total * rng.gauss(0.22, 0.03) if total else None,
+            "light_min": total * rng.gauss(0.55, 0.03) if total else None,
+            "awake_min": rng.gauss(25, 8) if rng.random() > 0.1 else None,
+            "hrv_ms": rng.gauss(48, 6) if rng.random() > 0.05 else None,
+            "resting_hr": rng.gauss(53, 2.5),
+        })
+    frame = pd.DataFrame(rows)
+    frame["date"] = pd.to_datetime(frame["date"])
+    return frame
+
+
+def per_row(frame: pd.DataFrame) -> list:
+    records = frame.to_dict("records")
+    dates = [r["date"].date() for r in records]
+    derived = [analytics.derive(r) for r in records]
+    out = []
+    for i, (day, night) in enumerate(zip(dates, derived)):
+        row = dict(night)
+        for metric in analytics.METRICS:
+            for days in analytics.WINDOWS:
+                lo = bisect.bisect_left(dates, day - datetime.timedelta(days=days), 0, i)
+                values = [derived[j][metric] for j in range(lo, i) if derived[j][metric] is not None]
+                base = analytics._baseline(values)
+                row[f"{metric}_median{days}"] = base["median"] if base else None
+                if days == analytics.BASELINE_DAYS:
+                    value = night[metric]
+                    z = None
+                    if base and value is not None:
+                        z = (value - base["mean"]) / base["stdev"] if base["stdev"] else 0.0
+                    row[f"{metric}_z"] = z
+        out.append(row)
+    return out
+
+
+def _mismatches(rows: list, frame: pd.DataFrame) -> int:
+    bad = 0
+    for row, (_, other) in zip(rows, frame.iterrows()):
+        for key, value in row.items():
+            theirs = other[key]
+            missing = theirs is None or (isinstance(theirs, float) and math.isnan(theirs))
+            if value is None:
+                bad += not missing
+            else:
+                bad += missing or abs(value - theirs) > 1e-7
+    return bad
+
+
+def _best(fn, *args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = _synthetic(args.years)
+    nights = len(frame)
+    analytics.derive_metrics(frame.head(50))  # warm pandas/numpy imports
+
+    slow = _best(per_row, frame, repeat=args.repeat)
+    fast = _best(analytics.derive_metrics, frame, repeat=args.repeat)
+    bad = _mismatches(per_row(frame), analytics.derive_metrics(frame))
+
+    print(f"nights={nights} years={args.years} repeat={args.repeat}")
+    print(f"per-row     {slow * 1e3:9.1f} ms  {nights / slow:12,.0f} nights/s")
+    print(f"vectorized  {fast * 1e3:9.1f} ms  {nights / fast:12,.0f} nights/s  ({slow / fast:.1f}x)")
+    print(f"mismatched values: {bad}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Seconds a cached entry is trusted before its file is stat'ed again; writes made
+# through Sky (job completion, _record_last) invalidate immediately instead.
+CHECK_INTERVAL = float(os.environ.get("SKY_DIGEST_CACHE_CHECK", "2.0"))
+
+# key -> (path, (mtime_ns, size), view, body bytes, checked_at)
+_CACHE: Dict[str, Tuple[str, Tuple[int, int], Any, bytes, float]] = {}
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _fingerprint(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _render(view: Any) -> bytes:
+    return json.dumps(view, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def get(
+    key: str,
+    path: str,
+    project: Callable[[Dict[str, Any]], Any] = lambda data: data,
+) -> Optional[Tuple[Any, bytes]]:
+    """Return ``(view, json_bytes)`` for the JSON file at ``path``, or None if it is missing.
+
+    ``project`` builds the cached view from the parsed file; it only runs when
+    the file is first seen or its mtime/size changed.
+    """
+    now = time.monotonic()
+    with _LOCK:
+        entry = _CACHE.get(key)
+        if entry and entry[0] == path and now - entry[4] < CHECK_INTERVAL:
+            _STATS["hits"] += 1
+            return entry[2], entry[3]
+    fingerprint = _fingerprint(path)
+    if fingerprint is None:
+        invalidate(key)
+        return None
+    if entry and entry[0] == path and entry[1] == fingerprint:
+        with _LOCK:
+            _CACHE[key] = (*entry[:4], now)
+            _STATS["hits"] += 1
+        return entry[2], entry[3]
+
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    view = project(data)
+    body = _render(view)
+    with _LOCK:
+        _CACHE[key] = (path, fingerprint, view, body, now)
+        _STATS["misses"] += 1
+    return view, body
+
+
+def put(key: str, path: str, data: Dict[str, Any], project: Callable[[Dict[str, Any]], Any] = lambda d: d) -> None:
+    """Prime ``key`` from a payload just written to ``path`` (the writer's hook)."""
+    fingerprint = _fingerprint(path)
+    if fingerprint is None:
+        return
+    view = project(data)
+    with _LOCK:
+        _CACHE[key] = (path, fingerprint, view, _render(view), time.monotonic())
+
+
+def invalidate(key: Optional[str] = None) -> None:
+    """Drop one entry, or everything when ``key`` is None."""
+    with _LOCK:
+        if key is None:
+            _CACHE.clear()
+        else:
+            _CACHE.pop(key, None)
+        _STATS["invalidations"] += 1
+
+
+def stats() -> Dict[str, int]:
+    with _LOCK:
+        return {"entries": len(_CACHE), **_STATS}
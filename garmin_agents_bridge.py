@@ -1,8 +1,11 @@
+import json
 import os
 import shutil
 import subprocess
 import sys
+import threading
 from datetime import datetime
+from hashlib import sha256
 from pathlib import Path
 from typing import Dict, List
 
@@ -10,6 +13,14 @@ GARMIN_AGENTS_PATH = Path(r"C:\Users\blyth\Desktop\Engineering\Sky\agents")
 GARMIN_DATA_PATH = Path(r"C:\Users\blyth\Desktop\Engineering\Sky\data\garmin_downloads")
 GARMIN_DOWNLOAD_CACHE = Path(r"C:\Users\blyth\Desktop\Engineering\Sky\downloads\garmin")
 DEFAULT_AGENT = "garmin_sleep_downloader.py"
+# "objects": sha256 -> staged copy + every inbox name that carried those bytes.
+# "sources": inbox name -> (size, mtime_ns, inode, sha256) ledger, so files
+# already staged are skipped on a stat alone.
+STAGING_MANIFEST = GARMIN_DATA_PATH.parent / "garmin_staging_manifest.json"
+# auto = hardlink, then reflink (Linux FICLONE), then a plain copy.
+STAGE_LINK_MODE = os.environ.get("SKY_GARMIN_STAGE_LINK", "auto")
+_FICLONE = 0x40049409
+_STAGING_LOCK = threading.Lock()
 
 
 def _safe_timestamp() -> str:
@@ -24,20 +35,130 @@ def _resolve_agent_script() -> Path:
     return candidate
 
 
-def _move_downloads() -> List[str]:
+def _hash_file(path: Path) -> str:
+    digest = sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_manifest() -> Dict[str, dict]:
+    if STAGING_MANIFEST.exists():
+        try:
+            return json.loads(STAGING_MANIFEST.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+    return {"objects": {}, "sources": {}}
+
+
+def _save_manifest(manifest: Dict[str, dict]) -> None:
+    tmp = STAGING_MANIFEST.with_name(STAGING_MANIFEST.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, STAGING_MANIFEST)
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    import fcntl
+
+    with src.open("rb") as s_handle, dest.open("wb") as d_handle:
+        fcntl.ioctl(d_handle.fileno(), _FICLONE, s_handle.fileno())
+    shutil.copystat(src, dest)
+
+
+def _link_or_copy(src: Path, dest: Path) -> str:
+    """Materialize ``src`` at ``dest`` as cheaply as the filesystem allows."""
+    if STAGE_LINK_MODE in ("auto", "hardlink"):
+        try:
+            os.link(src, dest)
+            return "hardlink"
+        except OSError:
+            pass
+    if STAGE_LINK_MODE in ("auto", "reflink") and sys.platform.startswith("linux"):
+        try:
+            _reflink(src, dest)
+            return "reflink"
+        except OSError:
+            dest.unlink(missing_ok=True)
+    shutil.copy2(src, dest)
+    return "copy"
+
+
+def stage_downloads() -> Dict[str, object]:
+    """Stage inbox CSVs by content: each distinct export is materialized once.
+
+    Returns ``{"staged": [...], "duplicates": [...], "unchanged": n, "methods": {...}}``;
+    duplicates are inbox files whose bytes are already staged under another
+    name and are only recorded as aliases in ``STAGING_MANIFEST``. Inbox files
+    whose fingerprint matches the ledger are counted as unchanged without
+    being read.
+    """
     GARMIN_DATA_PATH.mkdir(parents=True, exist_ok=True)
+    result: Dict[str, object] = {"staged": [], "duplicates": [], "unchanged": 0, "methods": {}}
     if not GARMIN_DOWNLOAD_CACHE.exists():
-        return []
+        return result
 
-    moved: List[str] = []
-    for csv_path in sorted(GARMIN_DOWNLOAD_CACHE.glob("*.csv")):
-        dest = GARMIN_DATA_PATH / csv_path.name
-        if dest.exists():
-            dest = GARMIN_DATA_PATH / f"{csv_path.stem}_{_safe_timestamp()}{csv_path.suffix}"
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(csv_path, dest)
-        moved.append(dest.name)
-    return moved
+    with _STAGING_LOCK:
+        manifest = _load_manifest()
+        objects = manifest.setdefault("objects", {})
+        sources = manifest.setdefault("sources", {})
+        now = datetime.now().isoformat()
+        dirty = False
+        with os.scandir(GARMIN_DOWNLOAD_CACHE) as entries:
+            inbox = sorted((e for e in entries if e.is_file() and e.name.lower().endswith(".csv")), key=lambda e: e.name)
+        for item in inbox:
+            st = os.stat(item.path)  # DirEntry.stat() has st_ino == 0 on Windows
+            fingerprint = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+            known = sources.get(item.name)
+            entry = objects.get((known or {}).get("sha256", ""))
+            if (
+                known
+                and entry
+                and all(known.get(k) == v for k, v in fingerprint.items())
+                and (GARMIN_DATA_PATH / entry["file"]).exists()
+            ):
+                result["unchanged"] += 1
+                continue
+
+            csv_path = Path(item.path)
+            digest = _hash_file(csv_path)
+            sources[item.name] = {**fingerprint, "sha256": digest}
+            dirty = True
+            entry = objects.get(digest)
+            if entry and (GARMIN_DATA_PATH / entry["file"]).exists():
+                if csv_path.name not in entry["aliases"]:
+                    entry["aliases"].append(csv_path.name)
+                entry["last_seen"] = now
+                if csv_path.name != entry["file"]:
+                    result["duplicates"].append(csv_path.name)
+                continue
+
+            dest = GARMIN_DATA_PATH / csv_path.name
+            if dest.exists() and _hash_file(dest) != digest:
+                dest = GARMIN_DATA_PATH / f"{csv_path.stem}_{_safe_timestamp()}{csv_path.suffix}"
+            if not dest.exists():
+                method = _link_or_copy(csv_path, dest)
+                result["methods"][method] = result["methods"].get(method, 0) + 1
+            objects[digest] = {
+                "file": dest.name,
+                "size": st.st_size,
+                "aliases": sorted({csv_path.name, *(entry or {}).get("aliases", [])}),
+                "first_seen": (entry or {}).get("first_seen", now),
+                "last_seen": now,
+            }
+            result["staged"].append(dest.name)
+        live = {item.name for item in inbox}
+        for gone in [name for name in sources if name not in live]:
+            del sources[gone]
+            dirty = True
+        if dirty or not STAGING_MANIFEST.exists():
+            _save_manifest(manifest)
+    return result
+
+
+def _move_downloads() -> List[str]:
+    """Stage new inbox CSVs and return the names written to the data folder."""
+    return stage_downloads()["staged"]
 
 
 def list_downloaded_files() -> List[str]:
@@ -52,12 +173,13 @@ def run_garmin_download() -> Dict[str, object]:
     try:
         agent_path = _resolve_agent_script()
     except FileNotFoundError as exc:
-        return {"status": "error", "error": str(exc), "staged_files": [], "files": []}
+        return {"status": "error", "error": str(exc), "staged_files": [], "duplicate_files": [], "files": []}
 
     summary: Dict[str, object] = {
         "status": "ok",
         "agent": str(agent_path),
         "staged_files": [],
+        "duplicate_files": [],
         "files": [],
     }
     skip_agent = os.environ.get("SKY_SKIP_GARMIN_AGENT", "0") == "1"
@@ -72,7 +194,10 @@ def run_garmin_download() -> Dict[str, object]:
             summary["status"] = "error"
             summary["error"] = str(exc)
 
-    moved = _move_downloads()
-    summary["staged_files"] = moved
+    staging = stage_downloads()
+    summary["staged_files"] = staging["staged"]
+    summary["duplicate_files"] = staging["duplicates"]
+    summary["unchanged_files"] = staging["unchanged"]
+    summary["stage_methods"] = staging["methods"]
     summary["files"] = list_downloaded_files()
     return summary
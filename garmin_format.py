@@ -0,0 +1,191 @@
+"""Single-pass parser for Garmin Connect's sectioned key/value sleep export.
+
+A Garmin sleep CSV looks like::
+
+    Sleep Score 1 Day,
+    Date,2025-10-31
+    Sleep Duration,7h 1m
+    ...
+    Sleep Timeline Metrics,
+    Resting Heart Rate,50 bpm
+
+Section headers carry an empty value; everything else is ``label,value`` with
+units baked into the value. ``parse_file`` turns that into a ``SleepRecord``
+with minutes, bpm, ms and percentages as floats. Stdlib only, so the morning
+reporter and pipeline worker processes can use it without pandas.
+"""
+import csv
+import re
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+_MISSING = {"", "--", "nan", "none", "null", "n/a"}
+_NUM_RE = re.compile(r"[-+]?\d+(?:[.,]\d+)?")
+_CLOCK_RE = re.compile(r"^(\d+):(\d{2})(?::(\d{2}))?$")
+_HM_RE = re.compile(r"^(?:(\d+)\s*h(?:ours?|rs?)?)?\s*(?:(\d+)\s*m(?:in(?:utes?)?)?)?\s*(?:(\d+)\s*s(?:ec(?:onds?)?)?)?$", re.I)
+_SECONDS_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*s(?:ec(?:onds?)?)?$", re.I)
+_LABEL_RE = re.compile(r"[^a-z0-9]+")
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Minutes from '7h 1m', '45m', '1:52', '1:52:30', '3600 s' or a bare number of minutes."""
+    if value is None:
+        return None
+    s = str(value).strip()
+    if s.lower() in _MISSING:
+        return None
+    try:
+        return float(s.replace(",", ""))
+    except ValueError:
+        pass
+    m = _CLOCK_RE.match(s)
+    if m:
+        return int(m.group(1)) * 60 + int(m.group(2)) + int(m.group(3) or 0) / 60.0
+    m = _SECONDS_RE.match(s)
+    if m:
+        return float(m.group(1)) / 60.0
+    m = _HM_RE.match(s)
+    if m and any(m.groups()):
+        return int(m.group(1) or 0) * 60 + int(m.group(2) or 0) + int(m.group(3) or 0) / 60.0
+    return None
+
+
+def parse_number(value: Optional[str]) -> Optional[float]:
+    """First number in a unit-suffixed value ('50 bpm', '+57', '43 ms', '96%'); None for '--'."""
+    if value is None or str(value).strip().lower() in _MISSING:
+        return None
+    m = _NUM_RE.search(str(value))
+    return float(m.group(0).replace(",", ".")) if m else None
+
+
+def _text(value: Optional[str]) -> Optional[str]:
+    s = (value or "").strip()
+    return None if s.lower() in _MISSING else s
+
+
+def normalize_label(label: str) -> str:
+    """'Avg SpO₂' -> 'avgspo2'; used to match export labels regardless of case/spacing."""
+    return _LABEL_RE.sub("", (label or "").replace("₂", "2").lower())
+
+
+@dataclass
+class SleepRecord:
+    """One night of Garmin sleep data. Durations in minutes, HR in bpm, HRV in ms, SpO2 in %."""
+
+    date: Optional[str] = None
+    total_min: Optional[float] = None
+    deep_min: Optional[float] = None
+    light_min: Optional[float] = None
+    rem_min: Optional[float] = None
+    awake_min: Optional[float] = None
+    score: Optional[float] = None
+    quality: Optional[str] = None
+    stress_avg: Optional[float] = None
+    resting_hr: Optional[float] = None
+    hrv_ms: Optional[float] = None
+    hrv_status: Optional[str] = None
+    restless_moments: Optional[float] = None
+    body_battery_change: Optional[float] = None
+    respiration_avg: Optional[float] = None
+    respiration_low: Optional[float] = None
+    spo2_avg: Optional[float] = None
+    spo2_low: Optional[float] = None
+    extra: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def inbed_min(self) -> Optional[float]:
+        total = (self.total_min or 0.0) + (self.awake_min or 0.0)
+        return total or None
+
+    @property
+    def eff(self) -> Optional[float]:
+        inbed = self.inbed_min
+        return 100.0 * self.total_min / inbed if inbed and self.total_min else None
+
+    def _pct(self, minutes: Optional[float]) -> Optional[float]:
+        return 100.0 * minutes / self.total_min if minutes is not None and self.total_min else None
+
+    @property
+    def deep_pct(self) -> Optional[float]:
+        return self._pct(self.deep_min)
+
+    @property
+    def rem_pct(self) -> Optional[float]:
+        return self._pct(self.rem_min)
+
+    @property
+    def light_pct(self) -> Optional[float]:
+        return self._pct(self.light_min)
+
+    @property
+    def has_sleep(self) -> bool:
+        return any(v is not None for v in (self.total_min, self.deep_min, self.rem_min, self.light_min))
+
+    def as_row(self) -> Dict[str, object]:
+        """Measured fields only (no ``extra``), keyed like the history store columns."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "extra"}
+
+    def to_dict(self) -> Dict[str, object]:
+        """Measured plus derived fields (in-bed time, efficiency, stage percentages)."""
+        out = asdict(self)
+        out.update(
+            inbed_min=self.inbed_min,
+            eff=self.eff,
+            deep_pct=self.deep_pct,
+            rem_pct=self.rem_pct,
+            light_pct=self.light_pct,
+        )
+        return out
+
+
+# normalized label -> (SleepRecord attribute, value parser)
+FIELDS: Dict[str, Tuple[str, Callable[[str], object]]] = {
+    "date": ("date", _text),
+    "sleepduration": ("total_min", parse_duration),
+    "deepsleepduration": ("deep_min", parse_duration),
+    "lightsleepduration": ("light_min", parse_duration),
+    "remduration": ("rem_min", parse_duration),
+    "remsleepduration": ("rem_min", parse_duration),
+    "awaketime": ("awake_min", parse_duration),
+    "sleepscore": ("score", parse_number),
+    "quality": ("quality", _text),
+    "stressavg": ("stress_avg", parse_number),
+    "restingheartrate": ("resting_hr", parse_number),
+    "avgovernighthrv": ("hrv_ms", parse_number),
+    "7davghrv": ("hrv_status", _text),
+    "restlessmoments": ("restless_moments", parse_number),
+    "bodybatterychange": ("body_battery_change", parse_number),
+    "avgrespiration": ("respiration_avg", parse_number),
+    "lowestrespiration": ("respiration_low", parse_number),
+    "avgspo2": ("spo2_avg", parse_number),
+    "lowestspo2": ("spo2_low", parse_number),
+}
+
+
+def parse_lines(lines: Iterable[str]) -> SleepRecord:
+    """Parse an iterable of CSV lines in one pass; unknown labels land in ``extra``."""
+    record = SleepRecord()
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        label = row[0].strip().lstrip("﻿")
+        value = row[1].strip() if len(row) > 1 else ""
+        if not label or not value:
+            continue  # blank line or section header
+        key = normalize_label(label)
+        spec = FIELDS.get(key)
+        if spec is None:
+            record.extra[label] = value
+            continue
+        attr, parser = spec
+        # Sleep Duration repeats under "Sleep Score Factors"; the first one wins.
+        if getattr(record, attr) is None:
+            setattr(record, attr, parser(value))
+    return record
+
+
+def parse_file(path: Path) -> SleepRecord:
+    """Read and parse one Garmin sleep export (BOM tolerant)."""
+    with Path(path).open("r", encoding="utf-8-sig", newline="") as handle:
+        return parse_lines(handle)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .runtime_metrics import timed_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+HISTORY_PATH = Path(r"C:\Users\blyth\Desktop\Engineering\Sky\data\garmin_history")
+# Parquet when pyarrow is installed; otherwise the same year partitions as CSV.
+# A partition keeps the format it was first written in, and reads find either.
+
+# One row per night. Durations are minutes; hr in bpm; hrv in ms.
+SCHEMA: Dict[str, str] = {
+    "date": "datetime64[ns]",
+    "total_min": "float64",
+    "deep_min": "float64",
+    "light_min": "float64",
+    "rem_min": "float64",
+    "awake_min": "float64",
+    "score": "float64",
+    "quality": "string",
+    "stress_avg": "float64",
+    "resting_hr": "float64",
+    "hrv_ms": "float64",
+    "hrv_status": "string",
+    "restless_moments": "float64",
+    "body_battery_change": "float64",
+    "respiration_avg": "float64",
+    "respiration_low": "float64",
+    "spo2_avg": "float64",
+    "spo2_low": "float64",
+    "source_file": "string",
+    "sha256": "string",
+    "ingested_at": "string",
+}
+
+# Writers in other processes (e.g. ``python -m Sky.garmin_watcher`` next to
+# Sky's jobs) are excluded by an O_EXCL lockfile in each year directory.
+LOCK_TIMEOUT = 30.0
+LOCK_STALE = 300.0
+_LOCK = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+def _use_parquet() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _suffixes() -> Tuple[str, str]:
+    # Parquet first when it can be read; a CSV partition written before
+    # pyarrow was installed (or after it was removed) is still found.
+    return ("nights.parquet", "nights.csv") if _use_parquet() else ("nights.csv", "nights.parquet")
+
+
+def _existing(year_dir: Path) -> Optional[Path]:
+    """The year's readable partition; parquet ones are skipped (with a warning) without pyarrow."""
+    for name in _suffixes():
+        path = year_dir / name
+        if not path.exists():
+            continue
+        if path.suffix == ".parquet" and not _use_parquet():
+            log.warning("skipping %s: pyarrow is not installed", path)
+            continue
+        return path
+    return None
+
+
+def _partition_file(root: Path, year: int) -> Path:
+    """The year's partition, keeping the format it was first written in."""
+    year_dir = root / f"year={year}"
+    existing = _existing(year_dir)
+    if existing:
+        return existing
+    if (year_dir / "nights.parquet").exists():
+        # Starting a CSV beside it would hide these rows again once pyarrow is back.
+        raise RuntimeError(f"{year_dir / 'nights.parquet'} needs pyarrow to be updated; install pyarrow")
+    return year_dir / _suffixes()[0]
+
+
+@contextmanager
+def _file_lock(lock: Path, timeout: float = LOCK_TIMEOUT, stale: float = LOCK_STALE) -> Iterator[None]:
+    """Cross-process O_EXCL lockfile; a lock older than ``stale`` seconds is taken over."""
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > stale:
+                    lock.unlink(missing_ok=True)  # previous holder died without cleaning up
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"{lock} is held by another process")
+            time.sleep(0.05)
+    with os.fdopen(fd, "w") as handle:
+        handle.write(f"{os.getpid()} {time.time()}")
+    try:
+        yield
+    finally:
+        lock.unlink(missing_ok=True)
+
+
+def _partition_lock(year_dir: Path):
+    """Hold ``year_dir/nights.lock`` for a read-modify-replace of that partition."""
+    return _file_lock(year_dir / "nights.lock")
+
+
+def _typed(frame: pd.DataFrame) -> pd.DataFrame:
+    pd = timed_import("pandas")
+    for column, dtype in SCHEMA.items():
+        if column not in frame.columns:
+            continue
+        if dtype.startswith("datetime"):
+            frame[column] = pd.to_datetime(frame[column])
+        elif dtype == "float64":
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def _read(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    pd = timed_import("pandas")
+    if path.suffix == ".parquet":
+        return _typed(pd.read_parquet(path, columns=columns))
+    return _typed(pd.read_csv(path, usecols=columns))
+
+
+def _write(frame: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def append_nights(records: Iterable[Dict[str, object]], root: Path | None = None) -> Dict[str, object]:
+    """Upsert nightly rows (keyed by date) into their year partitions."""
+    pd = timed_import("pandas")
+    root = Path(root or HISTORY_PATH)
+    rows = [r for r in records if r.get("date")]
+    if not rows:
+        return {"rows": 0, "partitions": []}
+    incoming = _typed(pd.DataFrame(rows).reindex(columns=list(SCHEMA)))
+    touched = []
+    with _LOCK:
+        for year, group in incoming.groupby(incoming["date"].dt.year):
+            with _partition_lock(root / f"year={int(year)}"):
+                path = _partition_file(root, int(year))
+                frame = pd.concat([_read(path), group], ignore_index=True) if path.exists() else group
+                frame = frame.drop_duplicates(subset="date", keep="last").sort_values("date").reset_index(drop=True)
+                _write(frame, path)
+            touched.append(str(path))
+    formats = {Path(p).suffix.lstrip(".") for p in touched}
+    return {"rows": len(rows), "partitions": touched, "format": formats.pop() if len(formats) == 1 else "mixed"}
+
+
+def query(
+    columns: Optional[List[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    root: Path | None = None,
+) -> pd.DataFrame:
+    """Read nightly history, touching only the partitions and columns requested."""
+    pd = timed_import("pandas")
+    root = Path(root or HISTORY_PATH)
+    wanted = None
+    if columns:
+        unknown = [c for c in columns if c not in SCHEMA]
+        if unknown:
+            raise ValueError(f"Unknown history columns: {', '.join(unknown)}")
+        wanted = ["date", *[c for c in columns if c != "date"]]
+    frames = [_read(p, wanted) for p in _partitions(root, start, end)]
+    if not frames:
+        return _typed(pd.DataFrame(columns=wanted or list(SCHEMA)))
+    frame = pd.concat(frames, ignore_index=True)
+    if start:
+        frame = frame[frame["date"] >= pd.Timestamp(start)]
+    if end:
+        frame = frame[frame["date"] <= pd.Timestamp(end)]
+    return frame.reset_index(drop=True)
+
+
+def trend(column: str, days: int = 90, end: Optional[date] = None, root: Path | None = None) -> Dict[str, object]:
+    """Mean/median/min/max of ``column`` over the trailing ``days`` nights."""
+    pd = timed_import("pandas")
+    end = end or date.today()
+    start = (pd.Timestamp(end) - pd.Timedelta(days=days - 1)).date()
+    series = query([column], start=start, end=end, root=root)[column].dropna()
+    if series.empty:
+        return {"column": column, "days": days, "nights": 0}
+    return {
+        "column": column,
+        "days": days,
+        "nights": int(series.size),
+        "mean": round(float(series.mean()), 2),
+        "median": round(float(series.median()), 2),
+        "min": round(float(series.min()), 2),
+        "max": round(float(series.max()), 2),
+    }
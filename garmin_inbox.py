@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+INBOX_DIR = Path(os.environ.get("SKY_GARMIN_INBOX", r"C:\Users\blyth\Desktop\Engineering\Sky\downloads\garmin"))
+# One persisted index per inbox directory, keyed by its resolved path:
+# {"dir_mtime_ns": n, "files": {name: [size, mtime_ns]}, "dates": {iso: name}, "order": [names newest first]}
+INDEX_PATH = Path(os.environ.get(
+    "SKY_GARMIN_INBOX_INDEX",
+    r"C:\Users\blyth\Desktop\Engineering\Sky\data\garmin_inbox_index.json",
+))
+_DATE_RE = re.compile(r"sleep-(\d{4}-\d{2}-\d{2})", re.I)
+_SLEEP_RE = re.compile(r"sleep-.*\.csv", re.I)
+_LOCK = threading.Lock()
+_MEMO: Dict[str, Dict[str, Any]] = {}
+
+
+def _key(directory: Path) -> str:
+    return os.path.normcase(str(directory.resolve()))
+
+
+def _load_all() -> Dict[str, Dict[str, Any]]:
+    try:
+        return json.loads(INDEX_PATH.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save(key: str, index: Dict[str, Any]) -> None:
+    try:
+        INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        data = _load_all()
+        data[key] = index
+        tmp = INDEX_PATH.with_name(INDEX_PATH.name + ".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, INDEX_PATH)
+    except OSError:
+        pass  # the in-process copy still serves lookups; the next scan retries
+
+
+def _rebuild(directory: Path, dir_mtime_ns: int) -> Dict[str, Any]:
+    """Rescan the folder, re-stat'ing every CSV so rewritten files get fresh size/mtime.
+
+    ``DirEntry.stat()`` comes from the directory listing on Windows, so this
+    costs no extra system calls there.
+    """
+    files: Dict[str, List[int]] = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith(".csv") or not entry.is_file():
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            files[entry.name] = [st.st_size, st.st_mtime_ns]
+    order = sorted(files, key=lambda name: files[name][1], reverse=True)
+    dates: Dict[str, str] = {}
+    for name in order:
+        match = _DATE_RE.search(name)
+        if match:
+            dates.setdefault(match.group(1), name)
+    return {"dir_mtime_ns": dir_mtime_ns, "files": files, "dates": dates, "order": order}
+
+
+def _stale(directory: Path, index: Dict[str, Any]) -> bool:
+    """True when an indexed file was rewritten in place (which leaves the folder mtime alone)."""
+    for name, recorded in index.get("files", {}).items():
+        try:
+            st = os.stat(directory / name)
+        except OSError:
+            return True
+        if [st.st_size, st.st_mtime_ns] != recorded:
+            return True
+    return False
+
+
+def refresh(directory: Optional[Path] = None) -> Dict[str, Any]:
+    """Return the index for ``directory``, rescanning when its mtime moved or an indexed file changed.
+
+    Folder mtime catches added, removed and renamed files; overwriting an
+    export in place only shows up in the file's own stat, so every indexed
+    file is re-stat'ed too (the inbox holds a few hundred files at most).
+    """
+    directory = Path(directory or INBOX_DIR)
+    try:
+        dir_mtime_ns = directory.stat().st_mtime_ns
+    except OSError:
+        return {"dir_mtime_ns": None, "files": {}, "dates": {}, "order": []}
+    key = _key(directory)
+    with _LOCK:
+        index = _MEMO.get(key)
+        if index is None:
+            index = _load_all().get(key) or {}
+        if index.get("dir_mtime_ns") != dir_mtime_ns or _stale(directory, index):
+            index = _rebuild(directory, dir_mtime_ns)
+            _save(key, index)
+        _MEMO[key] = index
+        return index
+
+
+def _entry(directory: Path, index: Dict[str, Any], name: str) -> Dict[str, Any]:
+    size, mtime_ns = index["files"][name]
+    return {"file": name, "path": str(directory / name), "size": size, "mtime": mtime_ns / 1e9}
+
+
+def lookup(iso: str, directory: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """Newest ``sleep-<iso>*.csv`` in the inbox, or None."""
+    directory = Path(directory or INBOX_DIR)
+    index = refresh(directory)
+    name = index["dates"].get(iso)
+    return _entry(directory, index, name) if name else None
+
+
+def latest(n: Optional[int] = 20, directory: Optional[Path] = None, sleep_only: bool = False) -> List[Dict[str, Any]]:
+    """Up to ``n`` inbox CSVs (all when None), newest first."""
+    directory = Path(directory or INBOX_DIR)
+    index = refresh(directory)
+    names = index["order"]
+    if sleep_only:
+        names = [name for name in names if _SLEEP_RE.search(name)]
+    return [_entry(directory, index, name) for name in names[:n]]
+
+
+def count(directory: Optional[Path] = None) -> int:
+    return len(refresh(directory)["files"])
@@ -1,19 +1,33 @@
+from __future__ import annotations
+
 import json
-import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from hashlib import sha256
 from pathlib import Path
-from typing import Dict, List, Optional
-
-import pandas as pd
+from typing import Dict, List, Optional, Tuple
 
-from .garmin_agents_bridge import run_garmin_download
+from .garmin_agents_bridge import _hash_file, run_garmin_download
+from .garmin_format import SleepRecord, parse_file
+from .garmin_history import _file_lock, append_nights
 
 DATA_ROOT = Path(r"C:\Users\blyth\Desktop\Engineering\Sky")
 GARMIN_DATA_PATH = DATA_ROOT / "data" / "garmin_downloads"
 GARMIN_REPORT_PATH = DATA_ROOT / "reports" / "garmin_reports"
 GARMIN_LOG_PATH = Path(r"C:\Users\blyth\Desktop\Engineering\rag_data\Sky\logs")
 GARMIN_STATE_FILE = GARMIN_LOG_PATH / "garmin_pipeline_state.json"
+FINGERPRINT_KEYS = ("size", "mtime_ns", "inode")
+DEFAULT_WORKERS = int(os.environ.get("SKY_GARMIN_WORKERS", "1"))
+# Seconds a run waits for another in-flight run, and after which a leftover lock is taken over.
+RUN_LOCK_TIMEOUT = float(os.environ.get("SKY_GARMIN_RUN_LOCK_TIMEOUT", "900"))
+RUN_LOCK_STALE = 3600.0
+_STATE_LOCK = threading.Lock()
+_RUN_LOCK = threading.Lock()
+
+# name -> (fingerprint, sha256) for files seen but not yet recorded in state.
+_DIGEST_CACHE: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+_DIGEST_LOCK = threading.Lock()
 
 
 def _ensure_dirs() -> None:
@@ -33,92 +47,111 @@ def _load_state() -> Dict[str, dict]:
 
 
 def _save_state(state: Dict[str, dict]) -> None:
-    GARMIN_STATE_FILE.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp = GARMIN_STATE_FILE.with_name(GARMIN_STATE_FILE.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, GARMIN_STATE_FILE)
 
 
-def _hash_file(path: Path) -> str:
-    digest = sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(65536), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
+def _commit_state(processed: Dict[str, dict]) -> Dict[str, dict]:
+    """Merge this run's entries into the latest on-disk state and save it atomically."""
+    with _STATE_LOCK:
+        state = _load_state()
+        state.setdefault("processed", {}).update(processed)
+        state["last_run"] = datetime.now().isoformat()
+        _save_state(state)
+    return state
 
 
-def detect_new_files(state: Dict[str, dict] | None = None) -> List[str]:
-    """List Garmin CSV files that are new or changed since the last run."""
+def _fingerprint(st: os.stat_result) -> Dict[str, int]:
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+
+def _digest_for(path: Path, fingerprint: Dict[str, int], recorded: Dict[str, object]) -> str:
+    """Return the SHA-256 of ``path``, hashing only if its fingerprint changed."""
+    if recorded.get("sha256") and all(recorded.get(k) == fingerprint[k] for k in FINGERPRINT_KEYS):
+        return str(recorded["sha256"])
+    key = tuple(fingerprint[k] for k in FINGERPRINT_KEYS)
+    with _DIGEST_LOCK:
+        cached = _DIGEST_CACHE.get(path.name)
+    if cached and cached[0] == key:
+        return cached[1]
+    digest = _hash_file(path)
+    with _DIGEST_LOCK:
+        _DIGEST_CACHE[path.name] = (key, digest)
+    return digest
+
+
+def scan_files(state: Dict[str, dict] | None = None) -> Dict[str, Dict[str, object]]:
+    """Fingerprint every Garmin CSV; costs one stat per file unless a file changed.
+
+    Returns ``{name: {"sha256", "size", "mtime_ns", "inode", "pending"}}``.
+    """
     _ensure_dirs()
     state = state or _load_state()
     processed = state.get("processed", {})
-    pending: List[str] = []
-    for file_path in sorted(GARMIN_DATA_PATH.glob("*.csv")):
-        digest = _hash_file(file_path)
-        recorded = processed.get(file_path.name, {})
-        if recorded.get("sha256") != digest:
-            pending.append(file_path.name)
-    return pending
+    scanned: Dict[str, Dict[str, object]] = {}
+    with os.scandir(GARMIN_DATA_PATH) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.lower().endswith(".csv"):
+                continue
+            # os.stat, not DirEntry.stat(): on Windows the latter reports st_ino as 0.
+            fingerprint = _fingerprint(os.stat(entry.path))
+            recorded = processed.get(entry.name, {})
+            digest = _digest_for(Path(entry.path), fingerprint, recorded)
+            scanned[entry.name] = {"sha256": digest, **fingerprint, "pending": recorded.get("sha256") != digest}
+    return dict(sorted(scanned.items()))
+
+
+def detect_new_files(state: Dict[str, dict] | None = None) -> List[str]:
+    """List Garmin CSV files that are new or changed since the last run."""
+    return [name for name, info in scan_files(state).items() if info["pending"]]
 
 
-def load_csv(path: Path) -> pd.DataFrame:
-    """Load and normalize a Garmin CSV."""
-    df = pd.read_csv(path)
-    df.columns = [col.strip().lower().replace(" ", "_") for col in df.columns]
-    return df
+def load_record(path: Path) -> SleepRecord:
+    """Parse a Garmin sleep export into a typed record (single pass, no pandas)."""
+    return parse_file(path)
 
 
-def _sanitize(value):
-    if value is pd.NA:
-        return None
+def _fmt(value: object, unit: str = "") -> str:
     if value is None:
-        return None
-    if isinstance(value, (str, bool, int)):
-        return value
+        return "--"
     if isinstance(value, float):
-        return None if math.isnan(value) else value
-    if hasattr(value, "item"):
-        try:
-            val = value.item()
-            return _sanitize(val)
-        except Exception:
-            pass
-    if hasattr(value, "isoformat"):
-        try:
-            return value.isoformat()
-        except Exception:
-            pass
-    if isinstance(value, dict):
-        return {k: _sanitize(v) for k, v in value.items()}
-    if isinstance(value, list):
-        return [_sanitize(v) for v in value]
-    return str(value)
+        return f"{value:.1f}{unit}" if value % 1 else f"{value:.0f}{unit}"
+    return f"{value}{unit}"
 
 
-def generate_report(df: pd.DataFrame, filename: str) -> Dict[str, object]:
-    """Generate JSON + text report summarizing the Garmin data."""
-    _ensure_dirs()
+def generate_report(record: SleepRecord, filename: str, report_dir: Path | None = None) -> Dict[str, object]:
+    """Generate JSON + text report summarizing one night of Garmin data."""
+    report_dir = Path(report_dir or GARMIN_REPORT_PATH)
+    report_dir.mkdir(parents=True, exist_ok=True)
     timestamp = datetime.now().isoformat()
-    stats = df.describe(include="all").fillna(value=pd.NA).to_dict()
+    metrics = record.to_dict()
     summary = {
         "file": filename,
         "timestamp": timestamp,
-        "rows": len(df),
-        "columns": list(df.columns),
-        "stats": _sanitize(stats),
+        "date": record.date,
+        "metrics": metrics,
     }
 
     base = Path(filename).stem
-    json_path = GARMIN_REPORT_PATH / f"{base}_summary.json"
-    text_path = GARMIN_REPORT_PATH / f"{base}_summary.txt"
+    json_path = report_dir / f"{base}_summary.json"
+    text_path = report_dir / f"{base}_summary.txt"
 
     json_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
 
     lines = [
         f"Garmin Report :: {filename}",
         f"Generated: {timestamp}",
-        f"Rows: {summary['rows']}",
-        f"Columns: {', '.join(summary['columns']) or '(none)'}",
+        f"Night: {record.date or '(unknown)'}",
         "",
-        "Statistics snapshot (JSON):",
-        json.dumps(summary["stats"], indent=2),
+        f"Sleep: {_fmt(record.total_min, ' min')} (score {_fmt(record.score)}, {record.quality or '--'})",
+        f"Stages: deep {_fmt(record.deep_min, ' min')} / light {_fmt(record.light_min, ' min')} / "
+        f"REM {_fmt(record.rem_min, ' min')} / awake {_fmt(record.awake_min, ' min')}",
+        f"Efficiency: {_fmt(record.eff, '%')}",
+        f"Resting HR: {_fmt(record.resting_hr, ' bpm')}  HRV: {_fmt(record.hrv_ms, ' ms')} ({record.hrv_status or '--'})",
+        f"Stress avg: {_fmt(record.stress_avg)}  Body Battery: {_fmt(record.body_battery_change)}",
+        f"Respiration: {_fmt(record.respiration_avg, ' brpm')} (low {_fmt(record.respiration_low, ' brpm')})",
+        f"SpO2: {_fmt(record.spo2_avg, '%')} (low {_fmt(record.spo2_low, '%')})",
     ]
     text_path.write_text("\n".join(lines), encoding="utf-8")
 
@@ -126,36 +159,137 @@ def generate_report(df: pd.DataFrame, filename: str) -> Dict[str, object]:
     return summary
 
 
-def run_garmin_pipeline(ensure_download: bool = False) -> Dict[str, object]:
-    """Main orchestrator for Garmin data ingestion and reporting."""
+def _ingest_file(file_path: str, report_dir: str) -> Dict[str, object]:
+    """Parse one CSV and write its reports; runs in a worker process when pooled."""
+    filename = Path(file_path).name
+    try:
+        record = load_record(Path(file_path))
+        return {
+            "file": filename,
+            "report": generate_report(record, filename, Path(report_dir)),
+            "night": record.as_row() if record.date else None,
+        }
+    except Exception as exc:
+        return {"file": filename, "error": str(exc)}
+
+
+def _ingest_all(pending: List[str], workers: int) -> List[Dict[str, object]]:
+    jobs = [(str(GARMIN_DATA_PATH / name), str(GARMIN_REPORT_PATH)) for name in pending]
+    if workers <= 1 or len(jobs) <= 1:
+        return [_ingest_file(*job) for job in jobs]
+
+    outcomes: List[Dict[str, object]] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = {pool.submit(_ingest_file, *job): Path(job[0]).name for job in jobs}
+        for future in as_completed(futures):
+            try:
+                outcomes.append(future.result())
+            except Exception as exc:  # worker crashed (e.g. BrokenProcessPool)
+                outcomes.append({"file": futures[future], "error": f"{type(exc).__name__}: {exc}"})
+    outcomes.sort(key=lambda o: pending.index(o["file"]))
+    return outcomes
+
+
+def _split_duplicates(
+    pending: List[str], scanned: Dict[str, Dict[str, object]], processed: Dict[str, dict]
+) -> Tuple[List[str], Dict[str, str]]:
+    """Keep one file per distinct sha256; map byte-identical copies to that file."""
+    owners = {
+        rec["sha256"]: name
+        for name, rec in processed.items()
+        if rec.get("sha256") and not rec.get("duplicate_of")
+    }
+    unique: List[str] = []
+    duplicates: Dict[str, str] = {}
+    for name in pending:
+        digest = scanned[name]["sha256"]
+        owner = owners.setdefault(digest, name)
+        if owner == name:
+            unique.append(name)
+        else:
+            duplicates[name] = owner
+    return unique, duplicates
+
+
+def run_garmin_pipeline(ensure_download: bool = False, workers: Optional[int] = None) -> Dict[str, object]:
+    """Main orchestrator for Garmin data ingestion and reporting.
+
+    ``workers`` > 1 fans pending files out to a process pool (default from
+    ``SKY_GARMIN_WORKERS``); state is merged once, after every file has finished.
+    Each night's metrics are also upserted into the columnar history store.
+    Byte-identical copies of an export are ingested once and recorded as
+    ``duplicate_of`` the first copy.
+
+    Runs are single-flight: the /garmin jobs, the watcher (in Sky or its own
+    process) and the morning sweep wait for each other instead of racing on
+    the state file.
+    """
+    lock = GARMIN_STATE_FILE.with_name(GARMIN_STATE_FILE.name + ".lock")
+    with _RUN_LOCK, _file_lock(lock, timeout=RUN_LOCK_TIMEOUT, stale=RUN_LOCK_STALE):
+        return _run_pipeline(ensure_download, workers)
+
+
+def _run_pipeline(ensure_download: bool, workers: Optional[int]) -> Dict[str, object]:
     state = _load_state()
     download_summary: Optional[Dict[str, object]] = None
     if ensure_download:
         download_summary = run_garmin_download()
 
-    pending = detect_new_files(state)
-    completed, errors = [], []
-    for filename in pending:
-        file_path = GARMIN_DATA_PATH / filename
-        try:
-            df = load_csv(file_path)
-            report = generate_report(df, filename)
-            completed.append(report)
-            state.setdefault("processed", {})[filename] = {
-                "sha256": _hash_file(file_path),
-                "last_processed": datetime.now().isoformat(),
-                "reports": report.get("report_paths", {}),
-            }
-        except Exception as exc:
-            errors.append({"file": filename, "error": str(exc)})
-
-    state["last_run"] = datetime.now().isoformat()
-    _save_state(state)
+    scanned = scan_files(state)
+    pending = [name for name, info in scanned.items() if info["pending"]]
+    unique, duplicates = _split_duplicates(pending, scanned, state.get("processed", {}))
+    completed, errors, nights = [], [], []
+    processed: Dict[str, dict] = {}
+    for outcome in _ingest_all(unique, workers or DEFAULT_WORKERS):
+        filename = outcome["file"]
+        if "error" in outcome:
+            errors.append({"file": filename, "error": outcome["error"]})
+            continue
+        report = outcome["report"]
+        completed.append(report)
+        info = scanned[filename]
+        if outcome.get("night"):
+            nights.append(
+                {
+                    **outcome["night"],
+                    "source_file": filename,
+                    "sha256": info["sha256"],
+                    "ingested_at": datetime.now().isoformat(),
+                }
+            )
+        processed[filename] = {
+            "sha256": info["sha256"],
+            **{k: info[k] for k in FINGERPRINT_KEYS},
+            "last_processed": datetime.now().isoformat(),
+            "reports": report.get("report_paths", {}),
+        }
+
+    skipped = []
+    for filename, canonical in duplicates.items():
+        if canonical not in processed and canonical not in state.get("processed", {}):
+            continue  # original failed this run; retry both next time
+        info = scanned[filename]
+        processed[filename] = {
+            "sha256": info["sha256"],
+            **{k: info[k] for k in FINGERPRINT_KEYS},
+            "last_processed": datetime.now().isoformat(),
+            "duplicate_of": canonical,
+        }
+        skipped.append({"file": filename, "duplicate_of": canonical})
+
+    # Single writer: nights from every worker land in the history store in one upsert.
+    try:
+        history = append_nights(nights)
+    except Exception as exc:
+        history = {"rows": 0, "error": str(exc)}
+    _commit_state(processed)
     result = {
         "completed_reports": len(completed),
         "pending_files": len(pending),
+        "duplicates": skipped,
         "errors": errors,
         "details": completed,
+        "history": history,
         "state_file": str(GARMIN_STATE_FILE),
     }
     if download_summary is not None:
@@ -0,0 +1,291 @@
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .garmin_agents_bridge import GARMIN_DATA_PATH, GARMIN_DOWNLOAD_CACHE, _move_downloads
+
+# Files the OS reports as fully written (inotify close-after-write or rename into
+# place) are ready at once; anything else must keep its size/mtime this long.
+SETTLE_SECONDS = float(os.environ.get("SKY_GARMIN_WATCH_SETTLE", "2.0"))
+POLL_INTERVAL = float(os.environ.get("SKY_GARMIN_WATCH_POLL", "0.5"))
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+log = logging.getLogger(__name__)
+
+
+def _is_csv(name: str) -> bool:
+    return name.lower().endswith(".csv")
+
+
+class _InotifyWatcher:
+    """Linux inotify over a handful of directories, via libc (no extra packages)."""
+
+    def __init__(self, directories: Iterable[Path]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._dirs[wd] = Path(directory)
+
+    def wait(self, timeout: float) -> Dict[Path, bool]:
+        """Changed CSVs -> True when the event says the writer is done (close-write / moved in)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return {}
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return {}
+        changed: Dict[Path, bool] = {}
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            name = buf[offset : offset + length].rstrip(b"\0").decode("utf-8", errors="replace")
+            offset += length
+            if name and wd in self._dirs and _is_csv(name):
+                path = self._dirs[wd] / name
+                changed[path] = changed.get(path, False) or bool(mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO))
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingWatcher:
+    """Fallback for platforms without inotify: one scandir per directory per tick."""
+
+    def __init__(self, directories: Iterable[Path], interval: float = POLL_INTERVAL) -> None:
+        self._dirs = [Path(d) for d in directories]
+        self._interval = interval
+        self._seen = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        seen: Dict[Path, Tuple[int, int]] = {}
+        for directory in self._dirs:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file() and _is_csv(entry.name):
+                            st = entry.stat()
+                            seen[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return seen
+
+    def wait(self, timeout: float) -> Dict[Path, bool]:
+        """Changed CSVs -> False: polling cannot tell whether the writer is done."""
+        time.sleep(min(timeout, self._interval))
+        current = self._scan()
+        changed = {p: False for p, fp in current.items() if self._seen.get(p) != fp}
+        self._seen = current
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(directories: Iterable[Path], force_polling: bool = False):
+    directories = list(directories)
+    if sys.platform.startswith("linux") and not force_polling:
+        try:
+            return _InotifyWatcher(directories)
+        except OSError as exc:
+            log.warning("inotify unavailable (%s); falling back to polling", exc)
+    return _PollingWatcher(directories)
+
+
+class _Debouncer:
+    """Hold paths until their writer closed them, or their size and mtime stop changing for ``settle`` seconds."""
+
+    def __init__(self, settle: float) -> None:
+        self.settle = settle
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        self._closed: Set[Path] = set()
+
+    def add(self, events: Dict[Path, bool]) -> None:
+        for path, closed in events.items():
+            self._pending.setdefault(path, ((-1, -1), time.monotonic()))
+            if closed:
+                self._closed.add(path)
+
+    def ready(self) -> List[Path]:
+        now = time.monotonic()
+        done: List[Path] = []
+        for path, (fp, since) in list(self._pending.items()):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                del self._pending[path]
+                self._closed.discard(path)
+                continue
+            if path in self._closed:
+                done.append(path)
+                del self._pending[path]
+                self._closed.discard(path)
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            if current != fp:
+                self._pending[path] = (current, now)
+            elif now - since >= self.settle:
+                done.append(path)
+                del self._pending[path]
+        return done
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+
+def wait_for_file(
+    directory: Path,
+    predicate: Callable[[Path], bool],
+    timeout: float,
+    settle: float = SETTLE_SECONDS,
+    force_polling: bool = False,
+) -> Optional[Path]:
+    """Return the newest settled CSV in ``directory`` matching ``predicate``.
+
+    Existing matches are returned immediately; otherwise this blocks on
+    filesystem events until one lands or ``timeout`` expires.
+    """
+    directory = Path(directory)
+    # Watch before listing so a file landing in between is not missed.
+    watcher = make_watcher([directory], force_polling=force_polling)
+    try:
+        existing = [p for p in directory.glob("*.csv") if predicate(p)]
+        if existing:
+            return max(existing, key=lambda p: p.stat().st_mtime)
+        debouncer = _Debouncer(settle)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            wait = 0.1 if debouncer else max(0.0, min(1.0, deadline - time.monotonic()))
+            debouncer.add({p: closed for p, closed in watcher.wait(wait).items() if predicate(p)})
+            ready = debouncer.ready()
+            if ready:
+                return max(ready, key=lambda p: p.stat().st_mtime)
+    finally:
+        watcher.close()
+    return None
+
+
+class GarminWatcher:
+    """Ingest Garmin CSVs as soon as they land in the inbox or data folder.
+
+    Files the watcher staged into the data folder itself are remembered by
+    (size, mtime) and their events skipped, so staging does not trigger a
+    second run; a later edit or a manual drop under the same name still does.
+    """
+
+    def __init__(
+        self,
+        inbox: Path = GARMIN_DOWNLOAD_CACHE,
+        data_path: Path = GARMIN_DATA_PATH,
+        settle: float = SETTLE_SECONDS,
+        force_polling: bool = False,
+    ) -> None:
+        self.inbox = Path(inbox)
+        self.data_path = Path(data_path)
+        self.settle = settle
+        self.force_polling = force_polling
+        self.runs: List[Dict[str, object]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._staged: Dict[Path, Tuple[int, int]] = {}
+
+    def _remember_staged(self, names: Iterable[str]) -> None:
+        for name in names:
+            path = self.data_path / name
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            self._staged[path] = (st.st_size, st.st_mtime_ns)
+
+    def _is_own(self, path: Path) -> bool:
+        fp = self._staged.pop(path, None)
+        if fp is None:
+            return False
+        try:
+            st = path.stat()
+        except OSError:
+            return True
+        return (st.st_size, st.st_mtime_ns) == fp
+
+    def _ingest(self, ready: List[Path]) -> Dict[str, object]:
+        from .garmin_pipeline import run_garmin_pipeline
+
+        started = time.monotonic()
+        staged = _move_downloads() if any(p.parent == self.inbox for p in ready) else []
+        self._remember_staged(staged)
+        result = run_garmin_pipeline()
+        record = {
+            "trigger": [p.name for p in ready],
+            "staged_files": staged,
+            "completed_reports": result.get("completed_reports"),
+            "errors": result.get("errors"),
+            "elapsed_ms": round((time.monotonic() - started) * 1000.0, 2),
+        }
+        self.runs = (self.runs + [record])[-20:]
+        log.info("garmin watcher ingested %s", record)
+        return record
+
+    def run(self) -> None:
+        for directory in (self.inbox, self.data_path):
+            directory.mkdir(parents=True, exist_ok=True)
+        watcher = make_watcher([self.inbox, self.data_path], force_polling=self.force_polling)
+        debouncer = _Debouncer(self.settle)
+        log.info("garmin watcher started (%s) on %s, %s", type(watcher).__name__, self.inbox, self.data_path)
+        try:
+            while not self._stop.is_set():
+                debouncer.add(watcher.wait(0.1 if debouncer else 1.0))
+                ready = [p for p in debouncer.ready() if not self._is_own(p)]
+                if ready:
+                    try:
+                        self._ingest(ready)
+                    except Exception:
+                        log.exception("garmin watcher ingest failed")
+        finally:
+            watcher.close()
+
+    def start(self) -> "GarminWatcher":
+        self._thread = threading.Thread(target=self.run, name="sky-garmin-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the Garmin inbox and ingest new CSVs")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS, help="Seconds a file must stay unchanged before ingest.")
+    parser.add_argument("--poll", action="store_true", help="Force the polling fallback instead of inotify.")
+    cli_args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        GarminWatcher(settle=cli_args.settle, force_polling=cli_args.poll).run()
+    except KeyboardInterrupt:
+        pass
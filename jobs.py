@@ -0,0 +1,187 @@
+import json
+import os
+import subprocess
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+JOBS_DIR = Path(os.environ.get("SKY_JOBS_DIR", r"C:\Users\blyth\Desktop\Engineering\Sky\jobs"))
+MAX_WORKERS = int(os.environ.get("SKY_JOB_WORKERS", "4"))
+ACTIVE = {"queued", "running"}
+
+_JOBS: Dict[str, Dict[str, object]] = {}
+_KEYS: Dict[str, str] = {}
+_LOCK = threading.Lock()
+_POOL = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="sky-job")
+_CURRENT = threading.local()
+
+
+def _record_path(job_id: str) -> Path:
+    return JOBS_DIR / f"{job_id}.json"
+
+
+def log_path(job_id: str) -> Path:
+    return JOBS_DIR / f"{job_id}.log"
+
+
+def _persist(job: Dict[str, object]) -> None:
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    path = _record_path(str(job["id"]))
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(job, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _load() -> None:
+    """Reload job records from disk; anything left queued/running was interrupted."""
+    if not JOBS_DIR.exists():
+        return
+    for path in JOBS_DIR.glob("*.json"):
+        try:
+            job = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        if not isinstance(job, dict) or "id" not in job or "kind" not in job:
+            continue
+        if job.get("status") in ACTIVE:
+            job.update(status="error", error="interrupted by restart", finished=datetime.now().isoformat())
+            _persist(job)
+        _JOBS[job["id"]] = job
+        if job.get("key"):
+            previous = _JOBS.get(_KEYS.get(job["key"], ""))
+            if previous is None or str(previous["created"]) < str(job["created"]):
+                _KEYS[job["key"]] = job["id"]
+
+
+def _update(job_id: str, **fields) -> None:
+    with _LOCK:
+        _JOBS[job_id].update(fields)
+        snapshot = dict(_JOBS[job_id])
+    _persist(snapshot)
+
+
+def _run(job_id: str, fn: Callable, args: tuple, kwargs: dict) -> None:
+    _CURRENT.job_id = job_id
+    _update(job_id, status="running", started=datetime.now().isoformat())
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as exc:
+        log(f"[error] {type(exc).__name__}: {exc}")
+        _update(
+            job_id,
+            status="error",
+            error=f"{type(exc).__name__}: {exc}",
+            traceback=traceback.format_exc(),
+            finished=datetime.now().isoformat(),
+        )
+        return
+    finally:
+        _CURRENT.job_id = None
+    _update(job_id, status="done", result=result, finished=datetime.now().isoformat())
+
+
+def submit(kind: str, fn: Callable, *args, idempotency_key: Optional[str] = None, force: bool = False, **kwargs) -> str:
+    """Queue ``fn`` on the shared worker pool and return the job id.
+
+    With ``idempotency_key`` (e.g. ``"morning:2025-11-12"``) an existing queued,
+    running or finished job for that key is returned instead of starting a new
+    one; failed jobs, or ``force=True``, allow a re-run.
+    """
+    with _LOCK:
+        if idempotency_key and not force:
+            existing = _JOBS.get(_KEYS.get(idempotency_key, ""))
+            if existing and existing["status"] != "error":
+                return str(existing["id"])
+        job_id = f"{kind}-{uuid.uuid4().hex[:12]}"
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "key": idempotency_key,
+            "status": "queued",
+            "created": datetime.now().isoformat(),
+            "started": None,
+            "finished": None,
+            "result": None,
+            "error": None,
+            "log": str(log_path(job_id)),
+        }
+        _JOBS[job_id] = job
+        if idempotency_key:
+            _KEYS[idempotency_key] = job_id
+    _persist(job)
+    _POOL.submit(_run, job_id, fn, args, kwargs)
+    return job_id
+
+
+def current_job_id() -> Optional[str]:
+    return getattr(_CURRENT, "job_id", None)
+
+
+def log(message: str, job_id: Optional[str] = None) -> None:
+    """Append a timestamped line to the job's log (defaults to the calling job)."""
+    job_id = job_id or current_job_id()
+    if not job_id:
+        return
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    with log_path(job_id).open("a", encoding="utf-8") as handle:
+        handle.write(f"{datetime.now().strftime('%H:%M:%S')} {message.rstrip()}\n")
+
+
+def run_logged(cmd: Sequence[str], job_id: Optional[str] = None, **popen_kwargs) -> int:
+    """Run ``cmd`` with stdout/stderr appended to the job's log; returns the exit code."""
+    job_id = job_id or current_job_id()
+    log(f"[run] {' '.join(map(str, cmd))}", job_id)
+    JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    with log_path(job_id).open("ab") as handle:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=handle, stderr=subprocess.STDOUT, **popen_kwargs)
+        rc = proc.wait()
+    log(f"[exit] {rc}", job_id)
+    return rc
+
+
+def follow_log(job_id: str, offset: int = 0, poll: float = 0.5, follow: bool = True) -> Iterator[bytes]:
+    """Yield log bytes from ``offset``; with ``follow`` keep tailing until the job ends."""
+    path = log_path(job_id)
+    while True:
+        job = get(job_id)
+        finished = job is None or job["status"] not in ACTIVE
+        if path.exists():
+            with path.open("rb") as handle:
+                handle.seek(offset)
+                chunk = handle.read()
+            if chunk:
+                offset += len(chunk)
+                yield chunk
+        if finished or not follow:
+            return
+        time.sleep(poll)
+
+
+def get(job_id: str) -> Optional[Dict[str, object]]:
+    with _LOCK:
+        job = _JOBS.get(job_id)
+        return dict(job) if job else None
+
+
+def active(kind: str) -> Optional[Dict[str, object]]:
+    """Return the first queued/running job of ``kind``, if any."""
+    with _LOCK:
+        for job in _JOBS.values():
+            if job["kind"] == kind and job["status"] in ACTIVE:
+                return dict(job)
+    return None
+
+
+def list_jobs(kind: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, object]]:
+    with _LOCK:
+        jobs = [dict(j) for j in _JOBS.values() if kind is None or j["kind"] == kind]
+    jobs.sort(key=lambda j: str(j["created"]), reverse=True)
+    return jobs[:limit] if limit else jobs
+
+
+_load()
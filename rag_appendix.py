@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Writers to the short-term log and the compactor share this lock so that a
+# compaction never drops a line appended mid-rewrite.
+SHORT_TERM_LOCK = threading.Lock()
+_PROMOTE_LOCK = threading.Lock()
+
+ANCHOR_BYTES = 64
+LONG_TERM_MIN_PRIORITY = 0.8
+
+
+def _watermark_path(log_path: Path) -> Path:
+    return log_path.with_name(log_path.name + ".watermark.json")
+
+
+def _anchor(handle, offset: int) -> str:
+    """Fingerprint the bytes just before ``offset`` so a rewritten log is detected."""
+    start = max(0, offset - ANCHOR_BYTES)
+    handle.seek(start)
+    return hashlib.sha1(handle.read(offset - start)).hexdigest()
+
+
+def load_watermark(log_path: Path) -> Dict[str, object]:
+    path = _watermark_path(log_path)
+    if path.exists():
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+    return {"offset": 0, "anchor": "", "updated": None}
+
+
+def save_watermark(log_path: Path, offset: int, anchor: str) -> Dict[str, object]:
+    """Persist the watermark atomically (write temp file, then replace)."""
+    mark = {"offset": offset, "anchor": anchor, "updated": datetime.now().isoformat()}
+    path = _watermark_path(log_path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(mark, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return mark
+
+
+def _resolve_offset(handle, size: int, mark: Dict[str, object]) -> int:
+    offset = int(mark.get("offset") or 0)
+    if offset <= 0 or offset > size:
+        return 0
+    if _anchor(handle, offset) != mark.get("anchor"):
+        return 0
+    return offset
+
+
+def read_pending(log_path: Path, max_items: int) -> Tuple[List[Dict[str, object]], int, int]:
+    """Return up to ``max_items`` complete records past the watermark.
+
+    Returns ``(records, start_offset, end_offset)``. A trailing line without a
+    newline is treated as an in-flight write and left for the next pass.
+    """
+    if not log_path.exists():
+        return [], 0, 0
+    records: List[Dict[str, object]] = []
+    with log_path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        start = _resolve_offset(handle, size, load_watermark(log_path))
+        handle.seek(start)
+        end = start
+        while len(records) < max_items:
+            raw = handle.readline()
+            if not raw or not raw.endswith(b"\n"):
+                break
+            end += len(raw)
+            try:
+                rec = json.loads(raw.decode("utf-8-sig"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            if isinstance(rec, dict) and isinstance(rec.get("text"), str) and rec["text"].strip():
+                records.append(rec)
+    return records, start, end
+
+
+def _batches(records: List[Dict[str, object]], size: int) -> List[List[Dict[str, object]]]:
+    size = max(1, size)
+    return [records[i : i + size] for i in range(0, len(records), size)]
+
+
+def _batch_id(texts: List[str]) -> str:
+    # Deterministic ids make a re-promoted batch (crash before commit) an upsert.
+    return "appendix-" + hashlib.sha1("\n".join(texts).encode("utf-8")).hexdigest()[:16]
+
+
+def _meta(rec: Dict[str, object]) -> Dict[str, object]:
+    meta = rec.get("meta")
+    return meta if isinstance(meta, dict) else {}
+
+
+def _tags(meta: Dict[str, object]) -> List[str]:
+    """``meta.tags`` as a list; a comma-separated string is split, not iterated."""
+    tags = meta.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    elif not isinstance(tags, (list, tuple, set)):
+        return []
+    return [str(t).strip() for t in tags if t is not None and str(t).strip()]
+
+
+def _promote_batch(rag, batch: List[Dict[str, object]], summarize: bool) -> List[str]:
+    texts = [str(rec["text"]).strip() for rec in batch]
+    if summarize:
+        summary = rag.summarize_block("\n".join(texts))
+        tags = sorted({t for rec in batch for t in _tags(_meta(rec))} | {"appendix"})
+        doc_id = rag.remember(
+            text=summary,
+            source="appendix",
+            kind="summary",
+            priority=LONG_TERM_MIN_PRIORITY,
+            tags=tags,
+            id_=_batch_id(texts),
+        )
+        return [doc_id]
+
+    ids = []
+    for rec, text in zip(batch, texts):
+        meta = _meta(rec)
+        ids.append(
+            rag.remember(
+                text=text,
+                source=meta.get("source", "appendix"),
+                kind=meta.get("kind", "note"),
+                priority=max(float(meta.get("priority", 0.0) or 0.0), LONG_TERM_MIN_PRIORITY),
+                tags=_tags(meta),
+                id_=_batch_id([text]),
+            )
+        )
+    return ids
+
+
+def compact(log_path: Path) -> int:
+    """Drop the promoted prefix of the short-term log; return bytes reclaimed."""
+    with SHORT_TERM_LOCK:
+        if not log_path.exists():
+            return 0
+        with log_path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            offset = _resolve_offset(handle, size, load_watermark(log_path))
+            if offset == 0:
+                return 0
+            handle.seek(offset)
+            remainder = handle.read()
+        tmp = log_path.with_name(log_path.name + ".compact")
+        tmp.write_bytes(remainder)
+        os.replace(tmp, log_path)
+        save_watermark(log_path, 0, "")
+    return offset
+
+
+def promote_incremental(
+    rag,
+    max_items: int = 50,
+    batch_size: int = 10,
+    workers: int = 4,
+    summarize: bool = True,
+    compact_after: bool = True,
+) -> Dict[str, object]:
+    """Promote short-term notes past the watermark into long-term memory.
+
+    Batches are summarized concurrently; the watermark only advances once every
+    batch in the pass has been written, so a failure re-promotes rather than loses.
+    """
+    if not _PROMOTE_LOCK.acquire(blocking=False):
+        return {"promoted": 0, "busy": True}
+    try:
+        log_path = Path(rag._short_term_path())
+        records, start, end = read_pending(log_path, max_items)
+        result: Dict[str, object] = {"promoted": 0, "batches": 0, "ids": [], "from_offset": start, "to_offset": end}
+        if end == start:
+            result["watermark"] = load_watermark(log_path)
+            return result
+
+        batches = _batches(records, batch_size)
+        ids: List[str] = []
+        if batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as pool:
+                for batch_ids in pool.map(lambda b: _promote_batch(rag, b, summarize), batches):
+                    ids.extend(batch_ids)
+
+        with log_path.open("rb") as handle:
+            anchor = _anchor(handle, end)
+        result["watermark"] = save_watermark(log_path, end, anchor)
+        result.update({"promoted": len(records), "batches": len(batches), "ids": ids})
+        if compact_after:
+            result["short_term_compacted"] = compact(log_path)
+        return result
+    finally:
+        _PROMOTE_LOCK.release()
+
+
+def pending_bytes(rag) -> Optional[int]:
+    log_path = Path(rag._short_term_path())
+    if not log_path.exists():
+        return None
+    with log_path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        return size - _resolve_offset(handle, size, load_watermark(log_path))
@@ -0,0 +1,137 @@
+import gc
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+ROOT = r"C:\Users\blyth\Desktop\Engineering"
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+AGENT_NAME = "Sky"
+
+_LOCK = threading.Lock()
+_RAG = None
+# Shared leases vs. the exclusive hold a restore takes to swap the store on
+# disk: Windows will not rename or delete the collection directory while any
+# client still has its sqlite/segment files open.
+_STATE = threading.Condition()
+_READERS = 0
+_SWAPPING = False
+_STATS: Dict[str, Optional[float]] = {"init_ms": None, "initialized_at": None, "swaps": 0}
+
+
+def build_rag():
+    """Construct a new AgentRAG for Sky without publishing it."""
+    from common.rag_store import AgentRAG
+
+    return AgentRAG(AGENT_NAME)
+
+
+def get_rag():
+    """Return the process-wide Sky RAG client, creating it on first use."""
+    global _RAG
+    rag = _RAG
+    if rag is not None:
+        return rag
+    with _STATE:
+        # Between retire_rag() and swap_rag() the directory is being replaced.
+        _STATE.wait_for(lambda: not _SWAPPING or _RAG is not None)
+    with _LOCK:
+        if _RAG is None:
+            start = time.perf_counter()
+            _RAG = build_rag()
+            _STATS["init_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+            _STATS["initialized_at"] = time.time()
+        return _RAG
+
+
+def swap_rag(new_rag):
+    """Publish ``new_rag`` as the shared client and return the previous one."""
+    global _RAG
+    with _LOCK:
+        old, _RAG = _RAG, new_rag
+        _STATS["swaps"] = (_STATS["swaps"] or 0) + 1
+    return old
+
+
+def acquire() -> None:
+    """Take a shared lease on the client; blocks while a restore holds it exclusively."""
+    global _READERS
+    with _STATE:
+        _STATE.wait_for(lambda: not _SWAPPING)
+        _READERS += 1
+
+
+def release() -> None:
+    global _READERS
+    with _STATE:
+        _READERS -= 1
+        _STATE.notify_all()
+
+
+@contextmanager
+def lease():
+    """``with lease() as rag:`` - the client cannot be closed or swapped until the block exits."""
+    acquire()
+    try:
+        yield get_rag()
+    finally:
+        release()
+
+
+@contextmanager
+def exclusive(timeout: Optional[float] = None):
+    """Stop new leases and wait for current holders to finish; TimeoutError if they do not."""
+    global _SWAPPING
+    with _STATE:
+        _STATE.wait_for(lambda: not _SWAPPING)
+        _SWAPPING = True
+        if not _STATE.wait_for(lambda: _READERS == 0, timeout):
+            _SWAPPING = False
+            _STATE.notify_all()
+            raise TimeoutError("RAG client still in use")
+    try:
+        yield
+    finally:
+        with _STATE:
+            _SWAPPING = False
+            _STATE.notify_all()
+
+
+def _close(rag) -> None:
+    # AgentRAG wraps a Chroma persistent client; use whichever close hook exists.
+    for target in (rag, getattr(rag, "client", None), getattr(rag, "_client", None)):
+        if target is None:
+            continue
+        try:
+            if callable(getattr(target, "close", None)):
+                target.close()
+                return
+            system = getattr(target, "_system", None)
+            if system is not None and callable(getattr(system, "stop", None)):
+                system.stop()
+                return
+        except Exception as exc:
+            logging.warning("Closing RAG client failed: %s: %s", type(exc).__name__, exc)
+
+
+def retire_rag() -> None:
+    """Unpublish and close the shared client so its files are released (call under ``exclusive()``)."""
+    global _RAG
+    with _LOCK:
+        old, _RAG = _RAG, None
+    if old is not None:
+        _close(old)
+    del old
+    gc.collect()  # drop the last sqlite handles held by unreachable client objects
+
+
+def is_loaded() -> bool:
+    return _RAG is not None
+
+
+def stats() -> Dict[str, Optional[float]]:
+    return {"loaded": is_loaded(), **_STATS}
@@ -7,13 +7,28 @@ ROOT = r"C:\Users\blyth\Desktop\Engineering"
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
-from flask import Blueprint, Response, current_app, jsonify, request, send_file
+from flask import Blueprint, Response, current_app, g, jsonify, request, send_file
 
-from common.rag_store import AgentRAG, read_jsonl_bomtolerant
-from Sky.runtime_metrics import record_event
+from Sky.rag_appendix import SHORT_TERM_LOCK, pending_bytes, promote_incremental
+from Sky.rag_provider import acquire, get_rag, release
+from Sky.runtime_metrics import record_event, timed_import
 
 bp = Blueprint("sky_rag", __name__)
-RAG = AgentRAG(agent_name="Sky")
+
+
+@bp.before_request
+def _lease_rag():
+    # Every route here touches the client; a restore waits for these to finish.
+    acquire()
+    g.rag_lease = True
+
+
+@bp.teardown_request
+def _release_rag(_exc=None):
+    if g.pop("rag_lease", False):
+        release()
+
+
 BASELINE_FILE = Path(r"C:\Users\blyth\Desktop\Engineering\Sky\Sky.txt")
 
 
@@ -23,7 +38,7 @@ def seed_sky_baseline() -> dict:
     text = BASELINE_FILE.read_text(encoding="utf-8").strip()
     if not text:
         return {"status": "empty", "path": str(BASELINE_FILE)}
-    RAG.remember(
+    get_rag().remember(
         text=text,
         source="sky",
         kind="baseline",
@@ -35,6 +50,7 @@ def seed_sky_baseline() -> dict:
 
 @bp.route("/rag/write", methods=["POST"])
 def rag_write():
+    rag = get_rag()
     js = request.get_json() or {}
     text = (js.get("text") or "").strip()
     if not text:
@@ -45,10 +61,11 @@ def rag_write():
         meta.setdefault("source", "api")
         meta.setdefault("kind", "note")
         meta["priority"] = priority
-        RAG.write_short_term(text, meta)
+        with SHORT_TERM_LOCK:
+            rag.write_short_term(text, meta)
         record_event("write")
         return jsonify({"ok": True, "short_term": True})
-    doc_id = RAG.remember(
+    doc_id = rag.remember(
         text=text,
         source=js.get("source", "api"),
         kind=js.get("kind", "note"),
@@ -69,16 +86,18 @@ def rag_seed_baseline_route():
 
 @bp.route("/rag/shortterm/list", methods=["GET"])
 def rag_shortterm_list():
+    rag = get_rag()
     limit = int(request.args.get("limit", 100))
     since_raw = request.args.get("since_ts")
     since_ts = float(since_raw) if since_raw else None
-    items = RAG.read_short_term(limit=limit, since_ts=since_ts)
+    items = rag.read_short_term(limit=limit, since_ts=since_ts)
     return jsonify({"items": items})
 
 
 @bp.route("/rag/shortterm/export", methods=["GET"])
 def rag_shortterm_export():
-    path = RAG._short_term_path()
+    rag = get_rag()
+    path = rag._short_term_path()
     if not os.path.exists(path):
         return Response("", mimetype="application/json")
 
@@ -94,12 +113,16 @@ def rag_shortterm_export():
 @bp.route("/rag/appendix", methods=["POST"])
 def rag_appendix():
     body = request.get_json(silent=True) or {}
-    max_items = int(body.get("max_items", 50))
-    summarize = bool(body.get("summarize", True))
-    clear_after = bool(body.get("clear_after", True))
-    result = RAG.appendix_promote(max_items=max_items, summarize=summarize)
-    if clear_after and result.get("promoted", 0) > 0:
-        result["short_term_cleared"] = RAG.clear_short_term()
+    rag = get_rag()
+    result = promote_incremental(
+        rag,
+        max_items=int(body.get("max_items", 50)),
+        batch_size=int(body.get("batch_size", 10)),
+        workers=int(body.get("workers", 4)),
+        summarize=bool(body.get("summarize", True)),
+        compact_after=bool(body.get("clear_after", True)),
+    )
+    result["pending_bytes"] = pending_bytes(rag)
     result["ok"] = True
     record_event("appendix")
     return jsonify(result)
@@ -107,11 +130,12 @@ def rag_appendix():
 
 @bp.route("/rag/search", methods=["POST"])
 def rag_search():
+    rag = get_rag()
     js = request.get_json() or {}
     q = (js.get("query") or "").strip()
     if not q:
         return jsonify({"ok": False, "error": "query required"}), 400
-    res = RAG.search(
+    res = rag.search(
         query=q,
         top_k=int(js.get("top_k", 6)),
         min_priority=float(js.get("min_priority", 0.0)),
@@ -126,12 +150,13 @@ def rag_search():
 @bp.route("/rag/review", methods=["POST"])
 def rag_review():
     try:
+        rag = get_rag()
         data = request.get_json(silent=True) or {}
         min_priority = 0.8
         top_k = int(data.get("top_k", 64))
         where_filter = data.get("where")
 
-        candidates = RAG.search(
+        candidates = rag.search(
             query=data.get("query", "") or "",
             top_k=top_k,
             min_priority=min_priority,
@@ -148,17 +173,17 @@ def rag_review():
 
             candidates = [hit for hit in candidates if _match(hit.get("meta") or {})]
 
-        existing = set(RAG.topic_signatures({"kind": "summary", "source": "review"}))
+        existing = set(rag.topic_signatures({"kind": "summary", "source": "review"}))
         created = []
         for hit in candidates:
             text = (hit.get("text") or "").strip()
             if not text:
                 continue
-            sig = RAG.signature_for_text(text)
+            sig = rag.signature_for_text(text)
             if sig in existing:
                 continue
-            summary = RAG.summarize_block(text)
-            new_id = RAG.remember(
+            summary = rag.summarize_block(text)
+            new_id = rag.remember(
                 text=summary,
                 source="review",
                 kind="summary",
@@ -177,6 +202,8 @@ def rag_review():
 @bp.route("/rag/import", methods=["POST"])
 def rag_import():
     try:
+        rag = get_rag()
+        read_jsonl_bomtolerant = timed_import("common.rag_store").read_jsonl_bomtolerant
         file = request.files.get("file")
         if not file:
             return jsonify({"ok": False, "error": "file missing"}), 400
@@ -196,7 +223,7 @@ def rag_import():
                 tags = meta.get("tags") or []
                 extra = meta.get("extra") or {}
                 doc_id = rec.get("id")
-                RAG.remember(
+                rag.remember(
                     text=text,
                     source=source,
                     kind=kind,
@@ -218,9 +245,10 @@ def rag_import():
 @bp.route("/rag/list", methods=["GET"])
 def rag_list():
     try:
+        rag = get_rag()
         limit = int(request.args.get("limit", 50))
         offset = int(request.args.get("offset", 0))
-        ids = RAG.list_ids(limit=limit, offset=offset)
+        ids = rag.list_ids(limit=limit, offset=offset)
         return jsonify({"ids": ids, "limit": limit, "offset": offset})
     except Exception as exc:
         current_app.logger.exception("rag_list failed")
@@ -230,6 +258,7 @@ def rag_list():
 @bp.route("/rag/list", methods=["POST"])
 def rag_list_post():
     try:
+        rag = get_rag()
         body = request.get_json(silent=True) or {}
         where = body.get("where")
         if where == {}:
@@ -238,7 +267,7 @@ def rag_list_post():
             return jsonify({"ok": False, "error": "where must be an object"}), 400
         limit = max(1, min(int(body.get("limit", 50)), 200))
         offset = max(0, int(body.get("offset", 0)))
-        result = RAG.get(
+        result = rag.get(
             ids=body.get("ids"),
             where=where,
             limit=limit,
@@ -253,11 +282,12 @@ def rag_list_post():
 @bp.route("/rag/get", methods=["POST"])
 def rag_get():
     try:
+        rag = get_rag()
         body = request.get_json(force=True) or {}
         where = body.get("where")
         if where == {}:
             where = None
-        result = RAG.get(
+        result = rag.get(
             ids=body.get("ids"),
             where=where,
             limit=int(body.get("limit", 100)),
@@ -271,6 +301,7 @@ def rag_get():
 
 @bp.route("/rag/delete", methods=["POST"])
 def rag_delete():
+    rag = get_rag()
     body = request.get_json(silent=True) or {}
     ids = body.get("ids")
     where = body.get("where")
@@ -279,7 +310,7 @@ def rag_delete():
     if not ids and not where:
         return jsonify({"ok": False, "error": "Provide ids or a where filter"}), 400
     try:
-        deleted = RAG.delete(ids=ids, where=where)
+        deleted = rag.delete(ids=ids, where=where)
         return jsonify({"deleted": deleted, "ok": True})
     except Exception as exc:
         current_app.logger.exception("rag_delete failed")
@@ -288,6 +319,7 @@ def rag_delete():
 
 @bp.route("/rag/update", methods=["POST"])
 def rag_update():
+    rag = get_rag()
     body = request.get_json(silent=True) or {}
     ids = body.get("ids")
     where = body.get("where")
@@ -295,7 +327,7 @@ def rag_update():
     if not updates:
         return jsonify({"ok": False, "error": "No updatable fields provided"}), 400
     try:
-        data = RAG.col.get(ids=ids) if ids else RAG.col.get(where=where)
+        data = rag.col.get(ids=ids) if ids else rag.col.get(where=where)
         got_ids = data.get("ids", [])
         docs = data.get("documents", [])
         metas = data.get("metadatas", [])
@@ -309,8 +341,8 @@ def rag_update():
             if isinstance(m.get("tags"), list):
                 m["tags"] = ",".join(str(t) for t in m["tags"])
             new_metas.append(m)
-        RAG.col.delete(ids=got_ids)
-        RAG.col.add(ids=got_ids, documents=docs, metadatas=new_metas)
+        rag.col.delete(ids=got_ids)
+        rag.col.add(ids=got_ids, documents=docs, metadatas=new_metas)
         return jsonify({"ok": True, "updated": len(got_ids)})
     except Exception as exc:
         return jsonify({"ok": False, "error": str(exc)}), 500
@@ -318,7 +350,8 @@ def rag_update():
 
 @bp.route("/rag/tags", methods=["GET"])
 def rag_tags():
-    data = RAG.col.get(include=["metadatas"])
+    rag = get_rag()
+    data = rag.col.get(include=["metadatas"])
     tags = set()
     for m in data.get("metadatas", []):
         if not m:
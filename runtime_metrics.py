@@ -1,6 +1,9 @@
+import importlib
+import sys
 import time
 from collections import deque
-from typing import Deque
+from contextlib import contextmanager
+from typing import Deque, Dict
 
 START_TS = time.time()
 COUNTS = {"sky_chat": 0, "sky_write": 0, "sky_search": 0, "sky_review": 0, "sky_appendix": 0}
@@ -10,6 +13,8 @@ RAG_K: Deque[int] = deque(maxlen=200)
 DEEPCODER_USAGE: Deque[int] = deque(maxlen=200)
 CHAT_DEPTH_COUNTS = {"fast": 0, "normal": 0, "deep": 0}
 GEMMA_CLASSIFIER_CALLS = 0
+STARTUP_TIMINGS: Dict[str, float] = {}
+STARTUP_MARKS: Dict[str, float] = {}
 
 
 def record_event(name: str) -> None:
@@ -39,6 +44,41 @@ def record_chat(
         GEMMA_CLASSIFIER_CALLS += 1
 
 
+def record_startup(label: str, elapsed_ms: float) -> None:
+    STARTUP_TIMINGS.setdefault(label, round(elapsed_ms, 2))
+
+
+def mark_startup(label: str) -> None:
+    """Record ms since process start the first time ``label`` is reached."""
+    STARTUP_MARKS.setdefault(label, round((time.time() - START_TS) * 1000.0, 2))
+
+
+@contextmanager
+def time_startup(label: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_startup(label, (time.perf_counter() - start) * 1000.0)
+
+
+def timed_import(module_name: str):
+    """Import ``module_name``, recording its cost the first time it is loaded."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with time_startup(f"import:{module_name}"):
+        return importlib.import_module(module_name)
+
+
+def startup_report() -> dict:
+    timings = sorted(STARTUP_TIMINGS.items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "marks_ms": STARTUP_MARKS.copy(),
+        "timings_ms": dict(timings),
+        "sum_ms": round(sum(v for _, v in timings), 2),
+    }
+
+
 def _percentile(samples, pct: float) -> float:
     if not samples:
         return 0.0
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import statistics
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from . import garmin_history
+from .runtime_metrics import timed_import
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Per-night derived metrics cached per history partition:
+# {"partitions": {path: {"stamp": [mtime_ns, size], "nights": {iso: {metric: value}}}}}.
+# Only partitions whose stamp moved are re-read; unchanged ones never touch
+# pandas or the history files.
+ANALYTICS_PATH = Path(os.environ.get(
+    "SKY_SLEEP_ANALYTICS",
+    r"C:\Users\blyth\Desktop\Engineering\Sky\data\sleep_analytics.json",
+))
+WINDOWS = (7, 30, 90)
+# Baseline used for the z-score, streaks and "vs your median" prose.
+BASELINE_DAYS = 30
+# Fewer prior nights than this and a window reports no baseline.
+MIN_NIGHTS = 5
+
+# metric -> (label, unit, higher_is_better)
+METRICS: Dict[str, Tuple[str, str, bool]] = {
+    "deep_pct": ("Deep sleep", "%", True),
+    "rem_pct": ("REM", "%", True),
+    "eff": ("Efficiency", "%", True),
+    "hrv": ("HRV", " ms", True),
+    "rhr": ("Resting HR", " bpm", False),
+}
+_HISTORY_COLUMNS = ["total_min", "deep_min", "light_min", "rem_min", "awake_min", "hrv_ms", "resting_hr"]
+_LOCK = threading.Lock()
+
+
+def _num(value: object) -> Optional[float]:
+    try:
+        out = float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(out) else out
+
+
+def derive(row: Dict[str, object]) -> Dict[str, Optional[float]]:
+    """Analytics metrics for one night from a history row or the reporter's metrics dict."""
+    total = _num(row.get("total_min"))
+    awake = _num(row.get("awake_min")) or 0.0
+
+    def first(*values: object) -> Optional[float]:
+        for value in values:
+            number = _num(value)
+            if number is not None:
+                return number
+        return None
+
+    def pct(column: str) -> Optional[float]:
+        minutes = _num(row.get(column))
+        return 100.0 * minutes / total if minutes is not None and total else None
+
+    return {
+        "deep_pct": first(row.get("deep_pct"), pct("deep_min")),
+        "rem_pct": first(row.get("rem_pct"), pct("rem_min")),
+        "eff": first(row.get("eff"), 100.0 * total / (total + awake) if total else None),
+        "hrv": first(row.get("hrv"), row.get("hrv_ms")),
+        "rhr": first(row.get("rhr"), row.get("resting_hr")),
+    }
+
+
+def derive_metrics(frame: pd.DataFrame, windows: Tuple[int, ...] = WINDOWS) -> pd.DataFrame:
+    """Every derived metric for every night of a columnar history, in one vectorized pass.
+
+    ``frame`` has ``date`` plus the history's minute/bpm/ms columns (any
+    missing ones count as unknown). Returns one row per night, sorted by date,
+    with in-bed time, efficiency, stage percentages, ``hrv``/``rhr``, and for
+    each analytics metric ``<metric>_median<N>`` over the N days *before* the
+    night plus ``<metric>_z`` against the ``BASELINE_DAYS`` window. Matches
+    ``derive``/``summary`` row by row.
+    """
+    pd = timed_import("pandas")
+    np = timed_import("numpy")
+    frame = frame.sort_values("date").reset_index(drop=True)
+
+    def column(name: str) -> np.ndarray:
+        if name not in frame:
+            return np.full(len(frame), np.nan)
+        return pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype="float64")
+
+    total = column("total_min")
+    awake = np.nan_to_num(column("awake_min"), nan=0.0)
+    inbed = np.nan_to_num(total, nan=0.0) + awake
+    has_total = np.nan_to_num(total, nan=0.0) != 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = pd.DataFrame({
+            "date": pd.to_datetime(frame["date"]),
+            "inbed_min": np.where(inbed != 0.0, inbed, np.nan),
+            "eff": np.where(has_total & (inbed != 0.0), 100.0 * total / inbed, np.nan),
+            "deep_pct": np.where(has_total, 100.0 * column("deep_min") / total, np.nan),
+            "rem_pct": np.where(has_total, 100.0 * column("rem_min") / total, np.nan),
+            "light_pct": np.where(has_total, 100.0 * column("light_min") / total, np.nan),
+            "hrv": column("hrv_ms"),
+            "rhr": column("resting_hr"),
+        })
+
+    # Time-based windows over prior nights only ([t - N days, t)), so gaps in
+    # the history shrink a window instead of stretching it.
+    series = out.set_index("date")[list(METRICS)]
+    baselines = {}
+    for days in windows:
+        rolling = series.rolling(f"{days}D", closed="left", min_periods=MIN_NIGHTS)
+        for metric, values in rolling.median().items():
+            baselines[f"{metric}_median{days}"] = values.to_numpy()
+    if BASELINE_DAYS in windows:
+        rolling = series.rolling(f"{BASELINE_DAYS}D", closed="left", min_periods=MIN_NIGHTS)
+        mean, std = rolling.mean(), rolling.std()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (series - mean) / std
+        z = z.where(std != 0.0, 0.0).where(mean.notna() & series.notna())
+        for metric, values in z.items():
+            baselines[f"{metric}_z"] = values.to_numpy()
+    return pd.concat([out, pd.DataFrame(baselines, index=out.index)], axis=1)
+
+
+def _load() -> Dict[str, Dict]:
+    try:
+        state = json.loads(ANALYTICS_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {}
+    return {"partitions": state.get("partitions") or {}}
+
+
+def _save(state: Dict[str, Dict]) -> None:
+    try:
+        ANALYTICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ANALYTICS_PATH.with_name(ANALYTICS_PATH.name + ".tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, ANALYTICS_PATH)
+    except OSError:
+        pass  # analytics are advisory; the next run recomputes
+
+
+def _derive_partition(path: Path) -> Optional[Dict[str, Dict[str, Optional[float]]]]:
+    try:
+        frame = garmin_history._read(path, ["date", *_HISTORY_COLUMNS])
+    except Exception:
+        return None  # pandas/partition unavailable: keep what is cached
+    derived = derive_metrics(frame, windows=())
+    keys = derived["date"].dt.strftime("%Y-%m-%d")
+    values = derived[list(METRICS)].astype(object)
+    values = values.where(values.notna(), None)
+    return dict(zip(keys, values.to_dict("records")))
+
+
+def refresh(end: Optional[date] = None, root: Optional[Path] = None) -> Dict[str, Dict[str, Optional[float]]]:
+    """Per-night metrics for the ``max(WINDOWS)`` nights up to ``end``.
+
+    Nights are cached per partition, so the window sliding forward (or a
+    backfill walking across a year boundary) costs nothing; only a partition
+    whose mtime/size changed is re-read and re-derived.
+    """
+    end = end or date.today()
+    start = end - timedelta(days=max(WINDOWS))
+    root = Path(root or garmin_history.HISTORY_PATH)
+    with _LOCK:
+        state = _load()
+        cached = state["partitions"]
+        changed = False
+        live = []
+        for part in garmin_history._partitions(root, start, end):
+            try:
+                st = part.stat()
+            except OSError:
+                continue
+            key, stamp = str(part), [st.st_mtime_ns, st.st_size]
+            live.append(key)
+            entry = cached.get(key)
+            if entry and entry.get("stamp") == stamp:
+                continue
+            nights = _derive_partition(part)
+            if nights is not None:
+                cached[key] = {"stamp": stamp, "nights": nights}
+                changed = True
+        for key in [k for k in cached if not Path(k).exists()]:
+            del cached[key]
+            changed = True
+        if changed:
+            _save(state)
+        lo, hi = start.isoformat(), end.isoformat()
+        return {
+            k: v
+            for key in live
+            for k, v in (cached.get(key) or {}).get("nights", {}).items()
+            if lo <= k <= hi
+        }
+
+
+def _baseline(values: List[float]) -> Optional[Dict[str, float]]:
+    if len(values) < MIN_NIGHTS:
+        return None
+    out = {"nights": len(values), "median": statistics.median(values), "mean": statistics.fmean(values)}
+    out["stdev"] = statistics.stdev(values) if len(values) > 1 else 0.0
+    return out
+
+
+def summary(iso: str, tonight: Optional[Dict[str, object]] = None, root: Optional[Path] = None) -> Dict[str, Dict]:
+    """Baselines, z-score and streak per metric for the night of ``iso``.
+
+    Baselines use the nights *before* ``iso``; the night itself comes from
+    ``tonight`` (the reporter's parsed metrics) or, failing that, history.
+    """
+    day = date.fromisoformat(iso)
+    nights = refresh(day, root)
+    current = derive(tonight) if tonight else nights.get(iso, {})
+    prior = sorted((k, v) for k, v in nights.items() if k < iso)
+    out: Dict[str, Dict] = {}
+    for metric in METRICS:
+        value = current.get(metric)
+        windows: Dict[int, Optional[Dict[str, float]]] = {}
+        for days in WINDOWS:
+            cutoff = (day - timedelta(days=days)).isoformat()
+            windows[days] = _baseline([v[metric] for k, v in prior if k >= cutoff and v.get(metric) is not None])
+        entry: Dict[str, object] = {"value": value, "windows": windows}
+        base = windows[BASELINE_DAYS]
+        if value is not None and base:
+            median = base["median"]
+            entry["vs_median_pct"] = 100.0 * (value - median) / median if median else None
+            entry["z"] = (value - base["mean"]) / base["stdev"] if base["stdev"] else 0.0
+            # Consecutive nights, ending tonight, on the same side of the baseline
+            # median; a missing night ends the run.
+            side = value > median
+            streak = 1
+            expected = day - timedelta(days=1)
+            for k, v in reversed(prior):
+                if date.fromisoformat(k) != expected:
+                    break
+                other = v.get(metric)
+                if other is None or other == median or (other > median) != side:
+                    break
+                streak += 1
+                expected -= timedelta(days=1)
+            entry["streak"] = {"side": "above" if side else "below", "nights": streak}
+        out[metric] = entry
+    return out
+
+
+def describe(stats: Dict[str, Dict], threshold_pct: float = 5.0) -> List[str]:
+    """Prose lines for metrics that moved at least ``threshold_pct`` off their baseline median."""
+    lines: List[str] = []
+    for metric, (label, unit, _higher_is_better) in METRICS.items():
+        entry = stats.get(metric) or {}
+        delta = entry.get("vs_median_pct")
+        if delta is None or abs(delta) < threshold_pct:
+            continue
+        median = entry["windows"][BASELINE_DAYS]["median"]
+        line = (
+            f"{label} is {abs(delta):.0f}% {'above' if delta > 0 else 'below'} "
+            f"your {BASELINE_DAYS}-day median ({median:.0f}{unit})"
+        )
+        streak = entry.get("streak") or {}
+        if streak.get("nights", 0) >= 3:
+            line += f", {streak['side']} it {streak['nights']} nights running"
+        lines.append(line + ".")
+    return lines
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import sqlite3
+import zipfile
+import zlib
+from datetime import datetime
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SNAPSHOT_DIRNAME = "snapshots"
+EXCLUDE_DIRS = {SNAPSHOT_DIRNAME, "traces"}
+CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _store_root(base_path: Path) -> Path:
+    return Path(base_path) / SNAPSHOT_DIRNAME
+
+
+def _object_path(store: Path, digest: str) -> Path:
+    return store / "objects" / digest[:2] / digest
+
+
+def _manifest_dir(store: Path) -> Path:
+    return store / "manifests"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _iter_files(base_path: Path):
+    for root, dirs, files in os.walk(base_path):
+        if Path(root) == base_path:
+            dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+        for name in files:
+            full = Path(root) / name
+            yield full, full.relative_to(base_path).as_posix()
+
+
+def list_snapshots(base_path: Path) -> List[str]:
+    mdir = _manifest_dir(_store_root(base_path))
+    if not mdir.exists():
+        return []
+    return sorted(p.stem for p in mdir.glob("*.json"))
+
+
+def load_manifest(base_path: Path, snapshot_id: str) -> Optional[Dict[str, object]]:
+    path = _manifest_dir(_store_root(base_path)) / f"{snapshot_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _store_chunks(store: Path, path: Path, stats: Dict[str, int]) -> List[str]:
+    chunks: List[str] = []
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest = sha256(block).hexdigest()
+            obj = _object_path(store, digest)
+            if not obj.exists():
+                _write_atomic(obj, zlib.compress(block, 6))
+                stats["bytes_new"] += len(block)
+                stats["chunks_new"] += 1
+            chunks.append(digest)
+    return chunks
+
+
+def create_snapshot(base_path: Path) -> Dict[str, object]:
+    """Write an incremental, content-addressed snapshot of ``base_path``.
+
+    Files whose size and mtime match the previous manifest reuse its chunk list
+    without being read; changed files are split into fixed-size chunks and only
+    chunks not already in the object store are written.
+    """
+    base_path = Path(base_path)
+    store = _store_root(base_path)
+    previous = list_snapshots(base_path)
+    parent = load_manifest(base_path, previous[-1]) if previous else None
+    prev_files: Dict[str, dict] = (parent or {}).get("files", {})
+
+    stats = {"bytes_total": 0, "bytes_new": 0, "chunks_new": 0, "files_rehashed": 0}
+    files: Dict[str, Dict[str, object]] = {}
+    for full, rel in _iter_files(base_path):
+        st = full.stat()
+        prior = prev_files.get(rel)
+        if prior and prior.get("size") == st.st_size and prior.get("mtime_ns") == st.st_mtime_ns:
+            chunks = prior["chunks"]
+        else:
+            chunks = _store_chunks(store, full, stats)
+            stats["files_rehashed"] += 1
+        files[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "chunks": chunks}
+        stats["bytes_total"] += st.st_size
+
+    snapshot_id = datetime.utcnow().strftime("sky_snapshot_%Y%m%d_%H%M%S_%f")
+    manifest = {
+        "id": snapshot_id,
+        "created": datetime.utcnow().isoformat() + "Z",
+        "parent": (parent or {}).get("id"),
+        "chunk_size": CHUNK_SIZE,
+        "files": files,
+        **stats,
+    }
+    _write_atomic(_manifest_dir(store) / f"{snapshot_id}.json", json.dumps(manifest, indent=2).encode("utf-8"))
+    return {"id": snapshot_id, "parent": manifest["parent"], "files": len(files), **stats}
+
+
+def materialize(base_path: Path, snapshot_id: str, dest: Path) -> Dict[str, object]:
+    """Rebuild the files of ``snapshot_id`` under ``dest``, verifying every chunk."""
+    manifest = load_manifest(base_path, snapshot_id)
+    if manifest is None:
+        raise FileNotFoundError(f"Unknown snapshot: {snapshot_id}")
+    store = _store_root(base_path)
+    dest = Path(dest)
+    written = 0
+    for rel, entry in manifest["files"].items():
+        target = dest / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("wb") as handle:
+            for digest in entry["chunks"]:
+                block = zlib.decompress(_object_path(store, digest).read_bytes())
+                if sha256(block).hexdigest() != digest:
+                    raise ValueError(f"Corrupt chunk {digest} in {rel}")
+                handle.write(block)
+        if target.stat().st_size != entry["size"]:
+            raise ValueError(f"Size mismatch for {rel}")
+        written += entry["size"]
+    return {"snapshot": snapshot_id, "files": len(manifest["files"]), "bytes": written}
+
+
+def extract_zip(zip_path: Path, dest: Path) -> Dict[str, object]:
+    """Unpack a legacy zip snapshot, refusing members that escape ``dest``."""
+    dest = Path(dest).resolve()
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        bad = zf.testzip()
+        if bad is not None:
+            raise ValueError(f"Corrupt zip member: {bad}")
+        for member in zf.namelist():
+            if not (dest / member).resolve().is_relative_to(dest):
+                raise ValueError(f"Unsafe zip member: {member}")
+        zf.extractall(dest)
+        return {"zip": str(zip_path), "files": len(zf.namelist())}
+
+
+def validate_staging(staging: Path) -> Dict[str, object]:
+    """Sanity-check an unpacked store before it is swapped in."""
+    files = [p for p in Path(staging).rglob("*") if p.is_file()]
+    if not files:
+        raise ValueError("Restored snapshot is empty")
+    checked = []
+    for db in (p for p in files if p.suffix in {".sqlite3", ".sqlite", ".db"}):
+        conn = sqlite3.connect(f"file:{db.as_posix()}?mode=ro", uri=True)
+        try:
+            status = conn.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            conn.close()
+        if status != "ok":
+            raise ValueError(f"{db.name} failed integrity check: {status}")
+        checked.append(db.name)
+    return {"files": len(files), "sqlite_checked": checked}
+
+
+def swap_directories(base_path: Path, staging: Path) -> Path:
+    """Move ``staging`` into place of ``base_path`` and return the retired directory.
+
+    The snapshot store and traces stay with the live location; on failure the
+    original directory is put back.
+    """
+    base_path = Path(base_path)
+    retired = base_path.with_name(f"{base_path.name}.old-{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}")
+    os.replace(base_path, retired)
+    try:
+        os.replace(staging, base_path)
+    except OSError:
+        os.replace(retired, base_path)
+        raise
+    for name in EXCLUDE_DIRS:
+        keep = retired / name
+        if keep.exists():
+            shutil.rmtree(base_path / name, ignore_errors=True)
+            os.replace(keep, base_path / name)
+    return retired
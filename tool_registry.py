@@ -1,58 +1,245 @@
+import ast
 import importlib
 import inspect
 import json
+import math
 import os
+import re
+import sys
+from collections import defaultdict
 from datetime import datetime
+from hashlib import sha256
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+_TOKEN_RE = re.compile(r"[A-Za-z][a-z]+|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = {"the", "and", "for", "with", "from", "into", "return", "returns", "this", "that", "a", "an", "of", "to", "or", "is", "on", "in", "by"}
+# Name tokens say most about what a tool does; docstrings and params add recall.
+_FIELD_WEIGHTS = {"name": 3.0, "module": 1.0, "params": 1.0, "doc": 1.0}
+
+
+def _tokens(text: str) -> List[str]:
+    return [t.lower() for t in _TOKEN_RE.findall(text or "") if len(t) > 1 and t.lower() not in _STOPWORDS]
+
+
+def _function_details_ast(node, source: bytes) -> Dict[str, object]:
+    args = node.args
+    hints: Dict[str, str] = {}
+    for arg in [*args.posonlyargs, *args.args, *args.kwonlyargs, args.vararg, args.kwarg]:
+        if arg is not None and arg.annotation is not None:
+            hints[arg.arg] = ast.unparse(arg.annotation)
+    if node.returns is not None:
+        hints["return"] = ast.unparse(node.returns)
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    signature = f"({ast.unparse(args)})" + (f" -> {hints['return']}" if "return" in hints else "")
+    segment = ast.get_source_segment(source.decode("utf-8", errors="replace"), node) or ""
+    return {
+        "signature": signature,
+        "kind": prefix,
+        "type_hints": hints,
+        "params": [a.arg for a in [*args.posonlyargs, *args.args, *args.kwonlyargs]],
+        "doc": ast.get_docstring(node) or "",
+        "lineno": node.lineno,
+        "source_sha256": sha256(segment.encode("utf-8")).hexdigest(),
+    }
+
+
+def _function_details_import(obj) -> Dict[str, object]:
+    try:
+        sig = inspect.signature(obj)
+        signature = str(sig)
+        hints = {name: inspect.formatannotation(p.annotation) for name, p in sig.parameters.items() if p.annotation is not p.empty}
+        if sig.return_annotation is not sig.empty:
+            hints["return"] = inspect.formatannotation(sig.return_annotation)
+        params = list(sig.parameters)
+    except (TypeError, ValueError):
+        signature, hints, params = "(...)", {}, []
+    try:
+        segment = inspect.getsource(obj)
+        lineno = inspect.getsourcelines(obj)[1]
+    except (OSError, TypeError):
+        segment, lineno = "", None
+    return {
+        "signature": signature,
+        "kind": "async def" if inspect.iscoroutinefunction(obj) else "def",
+        "type_hints": hints,
+        "params": params,
+        "doc": inspect.getdoc(obj) or "",
+        "lineno": lineno,
+        "source_sha256": sha256(segment.encode("utf-8")).hexdigest(),
+    }
 
 
 class ToolRegistry:
     """Registry and awareness system for callable Sky modules."""
 
     REGISTRY_FILE = Path(r"C:\Users\blyth\Desktop\Engineering\rag_data\Sky\logs\tool_registry.json")
+    SKIP_FILES = {"app.py", "__init__.py"}
+    SCHEMA_VERSION = 2
 
-    def __init__(self, base_path: Path | None = None) -> None:
+    def __init__(self, base_path: Path | None = None, mode: Optional[str] = None) -> None:
         self.base_path = Path(base_path or Path(__file__).resolve().parent)
         self.package = self.base_path.name
+        # "ast" parses source without executing it; "import" is the legacy behaviour.
+        self.mode = mode or os.environ.get("SKY_TOOL_DISCOVERY", "ast")
         self.tools: Dict[str, Dict[str, object]] = {}
+        self._fingerprints: Dict[str, Dict[str, object]] = {}
+        self._index: Dict[str, Dict[str, float]] = {}
+        self._load_cache()
         self.discover_tools()
+        if not self._index:
+            self._build_index()
+
+    def _load_cache(self) -> None:
+        if not self.REGISTRY_FILE.exists():
+            return
+        try:
+            payload = json.loads(self.REGISTRY_FILE.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if payload.get("mode") != self.mode or payload.get("schema") != self.SCHEMA_VERSION:
+            return
+        self.tools = payload.get("tools") or {}
+        self._fingerprints = payload.get("fingerprints") or {}
 
-    def _module_functions(self, module) -> List[str]:
-        funcs = []
+    def _module_functions(self, module) -> Dict[str, Dict[str, object]]:
+        funcs = {}
         for name, obj in inspect.getmembers(module, inspect.isfunction):
             if getattr(obj, "__module__", "") == module.__name__:
-                funcs.append(name)
-        return sorted(funcs)
+                funcs[name] = _function_details_import(obj)
+        return funcs
 
-    def discover_tools(self) -> None:
-        """Scan the Sky directory for modules and record callable functions."""
+    def _inspect_ast(self, source: bytes, file_path: Path) -> Dict[str, object]:
+        tree = ast.parse(source, filename=str(file_path))
+        details = {
+            node.name: _function_details_ast(node, source)
+            for node in tree.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+        return {"functions": sorted(details), "details": details, "doc": ast.get_docstring(tree) or "", "loaded": True}
+
+    def _inspect_import(self, module_name: str) -> Dict[str, object]:
+        qualified = f"{self.package}.{module_name}"
+        module = sys.modules.get(qualified)
+        module = importlib.reload(module) if module else importlib.import_module(qualified)
+        details = self._module_functions(module)
+        return {"functions": sorted(details), "details": details, "doc": inspect.getdoc(module) or "", "loaded": True}
+
+    def _inspect(self, file_path: Path, source: bytes) -> Dict[str, object]:
+        try:
+            if self.mode == "import":
+                return self._inspect_import(file_path.stem)
+            return self._inspect_ast(source, file_path)
+        except Exception as exc:  # pragma: no cover - logged for registry introspection
+            return {"error": str(exc), "loaded": False}
+
+    def discover_tools(self) -> bool:
+        """Scan the Sky directory, re-inspecting only modules whose files changed.
+
+        A module is skipped when its size and mtime match the cached fingerprint,
+        or when its content hash is unchanged. Returns True if the registry changed.
+        """
         if not self.base_path.exists():
-            return
+            return False
 
         registry: Dict[str, Dict[str, object]] = {}
+        fingerprints: Dict[str, Dict[str, object]] = {}
+        changed = False
         for file_path in sorted(self.base_path.glob("*.py")):
-            if file_path.name in {"app.py", "__init__.py"}:
+            if file_path.name in self.SKIP_FILES:
                 continue
             module_name = file_path.stem
-            try:
-                module = importlib.import_module(f"{self.package}.{module_name}")
-                functions = self._module_functions(module)
-                registry[module_name] = {"functions": functions, "loaded": True}
-            except Exception as exc:  # pragma: no cover - logged for registry introspection
-                registry[module_name] = {"error": str(exc), "loaded": False}
+            st = file_path.stat()
+            cached = self._fingerprints.get(module_name)
+            if (
+                cached
+                and module_name in self.tools
+                and cached.get("mtime_ns") == st.st_mtime_ns
+                and cached.get("size") == st.st_size
+            ):
+                registry[module_name] = self.tools[module_name]
+                fingerprints[module_name] = cached
+                continue
 
+            source = file_path.read_bytes()
+            digest = sha256(source).hexdigest()
+            fingerprints[module_name] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": digest}
+            if cached and module_name in self.tools and cached.get("sha256") == digest:
+                registry[module_name] = self.tools[module_name]
+                continue
+            registry[module_name] = self._inspect(file_path, source)
+            changed = True
+
+        changed = changed or set(registry) != set(self.tools) or fingerprints != self._fingerprints
         self.tools = registry
-        self._save()
+        self._fingerprints = fingerprints
+        if changed:
+            self._build_index()
+        if changed or not self.REGISTRY_FILE.exists():
+            self._save()
+        return changed
+
+    def _build_index(self) -> None:
+        """Precompute a weighted token -> {module.func: weight} inverted index."""
+        postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for module_name, entry in self.tools.items():
+            for func, info in (entry.get("details") or {}).items():
+                key = f"{module_name}.{func}"
+                fields = {
+                    "name": func,
+                    "module": module_name,
+                    "params": " ".join(info.get("params") or []),
+                    "doc": info.get("doc") or "",
+                }
+                for field, text in fields.items():
+                    for token in _tokens(text):
+                        postings[token][key] = postings[token].get(key, 0.0) + _FIELD_WEIGHTS[field]
+        total = max(1, sum(len(e.get("details") or {}) for e in self.tools.values()))
+        self._index = {
+            token: {key: tf * (1.0 + math.log(total / len(docs))) for key, tf in docs.items()}
+            for token, docs in postings.items()
+        }
+
+    def search(self, query: str, limit: int = 10, include_private: bool = False) -> List[Dict[str, object]]:
+        """Rank registered functions against ``query`` using the local keyword index."""
+        scores: Dict[str, float] = defaultdict(float)
+        for token in set(_tokens(query)):
+            for key, weight in self._index.get(token, {}).items():
+                scores[key] += weight
+        results = []
+        for key, score in sorted(scores.items(), key=lambda kv: (-kv[1], kv[0])):
+            module_name, func = key.split(".", 1)
+            if func.startswith("_") and not include_private:
+                continue
+            info = (self.tools.get(module_name, {}).get("details") or {}).get(func, {})
+            results.append(
+                {
+                    "tool": key,
+                    "score": round(score, 3),
+                    "signature": f"{func}{info.get('signature', '')}",
+                    "doc": (info.get("doc") or "").split("\n", 1)[0],
+                }
+            )
+            if len(results) >= limit:
+                break
+        return results
 
     def _save(self) -> None:
         os.makedirs(self.REGISTRY_FILE.parent, exist_ok=True)
-        payload = {"last_updated": datetime.now().isoformat(), "tools": self.tools}
-        with open(self.REGISTRY_FILE, "w", encoding="utf-8") as handle:
+        payload = {
+            "last_updated": datetime.now().isoformat(),
+            "mode": self.mode,
+            "schema": self.SCHEMA_VERSION,
+            "tools": self.tools,
+            "fingerprints": self._fingerprints,
+        }
+        tmp = self.REGISTRY_FILE.with_name(self.REGISTRY_FILE.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as handle:
             json.dump(payload, handle, indent=2)
+        os.replace(tmp, self.REGISTRY_FILE)
 
     def refresh(self) -> Dict[str, Dict[str, object]]:
-        """Force a rescan and return the updated registry."""
+        """Rescan changed modules and return the updated registry."""
         self.discover_tools()
         return self.tools
 
@@ -35,6 +35,8 @@ if /I "%ARG%"=="TODAY" (
 )
 
 rem ========= Lockfile =========
+rem Runs started by Sky's job queue (SKY_JOB_ID set) are de-duplicated per date there.
+if defined SKY_JOB_ID if not "%SKY_JOB_ID%"=="" goto :locked
 set "JOBS=%SKY%\jobs"
 if not exist "%JOBS%" mkdir "%JOBS%"
 set "LOCK=%JOBS%\morning_%ISO%.lock"
@@ -43,6 +45,7 @@ if exist "%LOCK%" (
   goto :end
 )
 echo %DATE% %TIME% > "%LOCK%"
+:locked
 
 echo ----------------------------------------------------
 echo Sky Garmin Full Morning Sweep
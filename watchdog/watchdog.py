@@ -14,6 +14,14 @@ try:
 except Exception:  # pragma: no cover
     requests = None  # type: ignore
 
+_ENGINEERING_ROOT = Path(__file__).resolve().parents[2]
+if str(_ENGINEERING_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ENGINEERING_ROOT))
+try:
+    from Sky import garmin_inbox
+except Exception:  # pragma: no cover
+    garmin_inbox = None  # type: ignore
+
 # === Paths ===
 CONFIG_PATH = Path(__file__).with_name("config.json")
 DEFAULT_STATUS_DIR = (
@@ -460,14 +468,17 @@ def main(argv: Optional[List[str]] = None) -> int:
             ddir = Path(gar.get("downloads_dir")) if gar.get("downloads_dir") else None
             if ddir and ddir.exists():
                 y = (datetime.now().date() - timedelta(days=1)).strftime("%Y-%m-%d")
-                prefix = f"sleep-{y}-"
                 found = []
-                for p in ddir.glob(f"{prefix}*.csv"):
-                    try:
-                        sz = p.stat().st_size
-                        found.append((p.name, sz))
-                    except Exception:
-                        continue
+                if garmin_inbox is not None:
+                    hit = garmin_inbox.lookup(y, directory=ddir)
+                    if hit:
+                        found.append((hit["file"], hit["size"]))
+                else:
+                    for p in ddir.glob(f"sleep-{y}-*.csv"):
+                        try:
+                            found.append((p.name, p.stat().st_size))
+                        except Exception:
+                            continue
                 if found:
                     name, sz = sorted(found, key=lambda t: t[1], reverse=True)[0]
                     results.append(CheckResult(name="garmin:csv:yesterday", ok=True, detail=f"{name} size={sz}"))